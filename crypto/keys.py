@@ -6,14 +6,14 @@ Handles private/public key generation, storage, and serialization.
 import json
 import base64
 from typing import Tuple, Dict
-from .utils import CryptoUtils
+from .utils import CryptoUtils, P, G, Q
 
 
 class KeyManager:
     """Manages cryptographic keys for students."""
     
     def __init__(self):
-        self.p, self.g, self.q = CryptoUtils.get_parameters()
+        self.p, self.g, self.q = P, G, Q
     
     def generate_keypair(self) -> Tuple[int, int]:
         """
@@ -26,10 +26,10 @@ class KeyManager:
             Tuple of (private_key, public_key)
         """
         # Generate private key x in range [1, q-1]
-        private_key = CryptoUtils.generate_random_in_range(self.q)
+        private_key = CryptoUtils.generate_random_in_range(Q)
         
         # Compute public key y = g^x mod p
-        public_key = CryptoUtils.mod_exp(self.g, private_key, self.p)
+        public_key = CryptoUtils.fixed_base_exp(private_key)
         
         return private_key, public_key
     
@@ -43,7 +43,7 @@ class KeyManager:
         Returns:
             Public key y = g^x mod p
         """
-        return CryptoUtils.mod_exp(self.g, private_key, self.p)
+        return CryptoUtils.fixed_base_exp(private_key)
     
     def verify_keypair(self, private_key: int, public_key: int) -> bool:
         """
@@ -63,6 +63,8 @@ class KeyManager:
     def serialize_keys(private_key: int, public_key: int) -> str:
         """
         Serialize keys to JSON string.
+        Keys are stored as base64 of their big-endian bytes, which avoids
+        converting 2048-bit integers to decimal.
         
         Args:
             private_key: Private key
@@ -72,8 +74,10 @@ class KeyManager:
             JSON string containing both keys
         """
         key_data = {
-            'private_key': str(private_key),
-            'public_key': str(public_key)
+            'private_key_b64': base64.b64encode(
+                CryptoUtils.int_to_bytes(private_key)).decode('utf-8'),
+            'public_key_b64': base64.b64encode(
+                CryptoUtils.int_to_bytes(public_key)).decode('utf-8')
         }
         return json.dumps(key_data)
     
@@ -89,6 +93,10 @@ class KeyManager:
             Tuple of (private_key, public_key)
         """
         key_data = json.loads(json_str)
+        if 'private_key_b64' in key_data:
+            return (CryptoUtils.bytes_to_int(base64.b64decode(key_data['private_key_b64'])),
+                    CryptoUtils.bytes_to_int(base64.b64decode(key_data['public_key_b64'])))
+        # Decimal format written by earlier versions
         return int(key_data['private_key']), int(key_data['public_key'])
     
     @staticmethod
@@ -131,9 +139,9 @@ class KeyManager:
         """
         return {
             'public_key': str(public_key),
-            'p': str(self.p),
-            'g': str(self.g),
-            'q': str(self.q)
+            'p': str(P),
+            'g': str(G),
+            'q': str(Q)
         }
     
     @staticmethod
@@ -9,16 +9,56 @@ Protocol Overview:
 5. Verification: Verifier checks if g^s = t * y^c mod p
 """
 
-from typing import Tuple, Dict
+import hashlib
+from typing import Tuple, Dict, Iterable
 from .utils import CryptoUtils
 
 
 class SchnorrZKP:
     """Schnorr Zero-Knowledge Proof protocol implementation."""
     
+    # Domain separation tag for Fiat-Shamir challenges
+    FIAT_SHAMIR_DOMAIN = b"ZKP/schnorr/fiat-shamir/v1"
+    
+    # SHA-256 state already seeded with the tag; copied for each challenge
+    _challenge_hasher = hashlib.sha256(FIAT_SHAMIR_DOMAIN)
+    
+    # Smallest batch verified with the combined check; smaller batches
+    # are verified proof by proof
+    MIN_BATCH_SIZE = 4
+    
     def __init__(self):
         self.p, self.g, self.q = CryptoUtils.get_parameters()
     
+    def _fiat_shamir_challenge(self, t: int, public_key: int, message: str) -> int:
+        """
+        Compute the Fiat-Shamir challenge for a commitment.
+        
+        Args:
+            t: Commitment
+            public_key: Public key y
+            message: Message bound to the proof
+            
+        Returns:
+            Challenge c = H(domain || g || y || t || message) mod q
+        """
+        # The generator is part of the statement, so it is bound into the
+        # transcript along with the public key and commitment
+        return CryptoUtils.hash_to_int(self.g, public_key, t, message,
+                                       hasher=self._challenge_hasher) % self.q
+    
+    def fixed_base_pow(self, exponent: int) -> int:
+        """
+        Compute g^exponent mod p from the precomputed window table for g.
+        
+        Args:
+            exponent: Exponent value
+            
+        Returns:
+            Result of g^exponent mod p
+        """
+        return CryptoUtils.fixed_base_exp(exponent)
+    
     def generate_commitment(self) -> Tuple[int, int]:
         """
         Generate commitment for ZKP (Prover step 1).
@@ -30,7 +70,7 @@ class SchnorrZKP:
         r = CryptoUtils.generate_random_in_range(self.q)
         
         # Compute commitment t = g^r mod p
-        t = CryptoUtils.mod_exp(self.g, r, self.p)
+        t = self.fixed_base_pow(r)
         
         return r, t
     
@@ -44,10 +84,12 @@ class SchnorrZKP:
         Returns:
             Random challenge c
         """
-        # Generate random challenge
+        # Generate random challenge with a single RNG call
         c = CryptoUtils.generate_random(bits)
-        # Ensure it's within valid range
-        c = c % self.q
+        # Ensure it's within valid range (already the case for challenges
+        # shorter than q, such as the default 256 bits)
+        if bits >= self.q.bit_length():
+            c %= self.q
         return c
     
     def generate_response(self, r: int, c: int, private_key: int) -> int:
@@ -81,16 +123,97 @@ class SchnorrZKP:
         Returns:
             True if proof is valid, False otherwise
         """
-        # Compute left side: g^s mod p
-        left = CryptoUtils.mod_exp(self.g, s, self.p)
+        # Compute left side: g^s mod p (from the precomputed table for g)
+        left = self.fixed_base_pow(s)
         
-        # Compute right side: t * y^c mod p
-        y_c = CryptoUtils.mod_exp(public_key, c, self.p)
+        # Compute right side: t * y^c mod p (y is reused across sessions,
+        # so its table is cached)
+        y_c = CryptoUtils.cached_base_exp(public_key, c)
         right = (t * y_c) % self.p
         
         # Verify equality
         return left == right
     
+    def verify_batch(self, items: Iterable[Tuple[int, int, int, int]]) -> bool:
+        """
+        Verify many proofs with a single randomized check.
+        
+        Each proof i is weighted by a random a_i < 2^128 and the checks are
+        combined into g^(sum a_i*s_i) = prod t_i^a_i * y_i^(a_i*c_i) mod p.
+        g is exponentiated once via its fixed-base table and the right-hand
+        side is one multi-exponentiation over short (~128 + |c| bit)
+        exponents. A batch containing any invalid proof passes with
+        probability at most about 2^-128.
+        
+        Args:
+            items: Iterable of (commitment t, response s, challenge c,
+                   public key y) tuples
+            
+        Returns:
+            True if every proof is valid, False otherwise
+        """
+        items = list(items)
+        # Too few proofs to amortize the multi-exponentiation tables
+        if len(items) < self.MIN_BATCH_SIZE:
+            return all(self.verify_proof(t, s, c, y) for t, s, c, y in items)
+        
+        s_sum = 0
+        terms = []
+        y_exponents: Dict[int, int] = {}
+        for t, s, c, y in items:
+            t %= self.p
+            y %= self.p
+            # g^s is always a square mod p, so t * y^c must be one too.
+            # Negating non-square t / y then moves both into the order-q
+            # subgroup without changing t * y^c, which is what makes the
+            # random weights sound
+            t_symbol = CryptoUtils.legendre(t)
+            y_symbol = CryptoUtils.legendre(y)
+            if t_symbol == 0 or y_symbol == 0:
+                return False
+            if t_symbol * (y_symbol if c & 1 else 1) != 1:
+                return False
+            if t_symbol < 0:
+                t = self.p - t
+            if y_symbol < 0:
+                y = self.p - y
+            
+            a = CryptoUtils.generate_random_in_range(1 << 128)
+            s_sum += a * s
+            terms.append((t, a))
+            # Proofs for the same key share one term
+            y_exponents[y] = y_exponents.get(y, 0) + a * c
+        
+        for y, exponent in y_exponents.items():
+            # Elements of the order-q subgroup: exponents only matter mod q
+            if not 0 <= exponent < self.q:
+                exponent %= self.q
+            terms.append((y, exponent))
+        
+        return self.fixed_base_pow(s_sum) == CryptoUtils.multi_exp(terms)
+    
+    def verify_non_interactive_batch(self, items: Iterable[Tuple[Dict[str, int], int, str]]) -> bool:
+        """
+        Verify many non-interactive proofs with a single randomized check.
+        
+        Args:
+            items: Iterable of (proof, public key y, message) tuples, each
+                   proof holding commitment, response and optionally
+                   challenge
+            
+        Returns:
+            True if every proof is valid, False otherwise
+        """
+        batch = []
+        for proof, public_key, message in items:
+            t = proof['commitment']
+            c = self._fiat_shamir_challenge(t, public_key, message)
+            # A challenge included in the proof must match the derived one
+            if proof.get('challenge', c) != c:
+                return False
+            batch.append((t, proof['response'], c, public_key))
+        return self.verify_batch(batch)
+    
     def create_proof(self, private_key: int, challenge: int) -> Dict[str, int]:
         """
         Create a complete ZKP proof given a challenge.
@@ -148,7 +271,7 @@ class SchnorrZKP:
         r, t = self.generate_commitment()
         
         # Generate challenge using hash (Fiat-Shamir)
-        c = CryptoUtils.hash_to_int(t, public_key, message) % self.q
+        c = self._fiat_shamir_challenge(t, public_key, message)
         
         # Generate response
         s = self.generate_response(r, c, private_key)
@@ -163,9 +286,12 @@ class SchnorrZKP:
                                     public_key: int, message: str = "") -> bool:
         """
         Verify a non-interactive ZKP proof.
+        The challenge is re-derived from the transcript, so it does not
+        need to be sent (or stored) at all.
         
         Args:
-            proof: Dictionary with commitment, response, and challenge
+            proof: Dictionary with commitment, response, and optionally
+                   challenge
             public_key: Public key y
             message: Optional message that was included
             
@@ -174,11 +300,10 @@ class SchnorrZKP:
         """
         t = proof['commitment']
         s = proof['response']
-        c = proof['challenge']
         
-        # Verify challenge was computed correctly
-        expected_c = CryptoUtils.hash_to_int(t, public_key, message) % self.q
-        if c != expected_c:
+        # Derive the challenge; one included in the proof must match it
+        c = self._fiat_shamir_challenge(t, public_key, message)
+        if proof.get('challenge', c) != c:
             return False
         
         # Verify the proof
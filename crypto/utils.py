@@ -5,7 +5,13 @@ Provides safe prime generation, random number generation, and modular arithmetic
 
 import secrets
 import hashlib
-from typing import Tuple
+import functools
+from typing import Any, List, Optional, Sequence, Tuple
+
+try:
+    import gmpy2  # type: ignore
+except ImportError:  # GMP acceleration is optional
+    gmpy2 = None
 
 
 class CryptoUtils:
@@ -34,6 +40,29 @@ class CryptoUtils:
     # Order q = (p-1)/2
     Q = (P - 1) // 2
     
+    # p and g as GMP integers when gmpy2 is available, so arithmetic on
+    # precomputed values stays in GMP
+    _P_BIG: Any = gmpy2.mpz(P) if gmpy2 is not None else P
+    _G_BIG: Any = gmpy2.mpz(G) if gmpy2 is not None else G
+    
+    # Window width (bits) for the fixed-base table of g; 6 bits gives
+    # 342 rows of 64 entries (about 5.6 MB) for a 2047-bit q
+    G_WINDOW: int = 6
+    
+    # Window width (bits) for simultaneous multi-exponentiation
+    MULTI_EXP_WINDOW: int = 4
+    
+    # Per-base tables for cached_base_exp: window width, longest exponent
+    # covered (challenge size) and number of bases kept; each table holds
+    # CACHED_EXP_BITS / CACHED_EXP_WINDOW entries (16 KB for 2048-bit p)
+    CACHED_EXP_WINDOW: int = 4
+    CACHED_EXP_BITS: int = 256
+    CACHED_EXP_SIZE: int = 1024
+    
+    # Fixed-base table: _G_TABLE[i][k] = g^(k * 2^(G_WINDOW*i)) mod p,
+    # built on first use by _get_g_table()
+    _G_TABLE: Optional[List[List[Any]]] = None
+    
     @staticmethod
     def generate_random(bits: int = 256) -> int:
         """
@@ -57,14 +86,26 @@ class CryptoUtils:
             
         Returns:
             Random integer in valid range
+            
+        Raises:
+            ValueError: If max_value is less than 2 (the range is empty)
         """
-        return secrets.randbelow(max_value - 1) + 1
+        if max_value < 2:
+            raise ValueError("max_value must be at least 2")
+        # Rejection sampling over the bit length of max_value - 1 (so a
+        # power of two is not drawn from twice the needed range); for the
+        # group order q this almost always succeeds on the first draw
+        bits = (max_value - 1).bit_length()
+        while True:
+            value = secrets.randbits(bits)
+            if 1 <= value < max_value:
+                return value
     
     @staticmethod
     def mod_exp(base: int, exponent: int, modulus: int) -> int:
         """
         Modular exponentiation: (base^exponent) mod modulus.
-        Uses Python's built-in pow for efficiency.
+        Uses GMP (via gmpy2) when available, otherwise Python's built-in pow.
         
         Args:
             base: Base value
@@ -74,22 +115,188 @@ class CryptoUtils:
         Returns:
             Result of modular exponentiation
         """
+        if gmpy2 is not None:
+            return int(gmpy2.powmod(base, exponent, modulus))
         return pow(base, exponent, modulus)
     
+    @classmethod
+    def _get_g_table(cls) -> List[List[Any]]:
+        """
+        Get the fixed-base table for g, building it on first use.
+        
+        Returns:
+            List of rows, one per G_WINDOW-bit window of an exponent < q
+        """
+        if cls._G_TABLE is None:
+            table: List[List[Any]] = []
+            base = cls._G_BIG
+            for _ in range((cls.Q.bit_length() + cls.G_WINDOW - 1) // cls.G_WINDOW):
+                row = [1] * (1 << cls.G_WINDOW)
+                for k in range(1, len(row)):
+                    row[k] = (row[k - 1] * base) % cls._P_BIG
+                table.append(row)
+                base = (row[-1] * base) % cls._P_BIG
+            cls._G_TABLE = table
+        return cls._G_TABLE
+    
+    @classmethod
+    def precompute_fixed_base(cls) -> None:
+        """Build the fixed-base table for g now rather than on first use."""
+        cls._get_g_table()
+    
+    @classmethod
+    def fixed_base_exp(cls, exponent: int) -> int:
+        """
+        Fixed-base exponentiation: (g^exponent) mod p.
+        Uses the precomputed window table for g, so only one modular
+        multiplication is needed per G_WINDOW bits of the exponent.
+        
+        Args:
+            exponent: Exponent value
+            
+        Returns:
+            Result of g^exponent mod p
+        """
+        table = cls._get_g_table()
+        mask = (1 << cls.G_WINDOW) - 1
+        # g has order q, so the exponent can be reduced first
+        exponent %= cls.Q
+        result = 1
+        for row in table:
+            if not exponent:
+                break
+            digit = exponent & mask
+            if digit:
+                result = (result * row[digit]) % cls._P_BIG
+            exponent >>= cls.G_WINDOW
+        return int(result)
+    
+    @classmethod
+    @functools.lru_cache(maxsize=CACHED_EXP_SIZE)
+    def _get_base_table(cls, base: int) -> Tuple[Any, ...]:
+        """
+        Get the table of base^(2^(CACHED_EXP_WINDOW*i)) mod p for a base,
+        building it on first use (least recently used tables are dropped).
+        """
+        table = [base % cls._P_BIG]
+        for _ in range((cls.CACHED_EXP_BITS + cls.CACHED_EXP_WINDOW - 1) // cls.CACHED_EXP_WINDOW - 1):
+            value = table[-1]
+            for _ in range(cls.CACHED_EXP_WINDOW):
+                value = (value * value) % cls._P_BIG
+            table.append(value)
+        return tuple(table)
+    
+    @classmethod
+    def cached_base_exp(cls, base: int, exponent: int) -> int:
+        """
+        Modular exponentiation (base^exponent) mod p for a base that is
+        used repeatedly, such as a public key raised to challenges.
+        Exponents of up to CACHED_EXP_BITS bits use Yao's method over a
+        cached table of the base, costing about one multiplication per
+        CACHED_EXP_WINDOW bits plus 2^CACHED_EXP_WINDOW; longer (or
+        negative) exponents fall back to mod_exp.
+        
+        Args:
+            base: Base value
+            exponent: Exponent value
+            
+        Returns:
+            Result of base^exponent mod p
+        """
+        if not 0 <= exponent < (1 << cls.CACHED_EXP_BITS):
+            return cls.mod_exp(base, exponent, cls.P)
+        
+        table = cls._get_base_table(base)
+        width = cls.CACHED_EXP_WINDOW
+        mask = (1 << width) - 1
+        
+        # Group the table entries by the exponent digit they carry
+        buckets: List[List[Any]] = [[] for _ in range(mask + 1)]
+        for entry in table:
+            if not exponent:
+                break
+            buckets[exponent & mask].append(entry)
+            exponent >>= width
+        
+        # result = prod_d (prod of bucket d)^d, accumulated from the top
+        # digit down so each digit costs one extra multiplication
+        result = 1
+        partial = 1
+        for digit in range(mask, 0, -1):
+            for entry in buckets[digit]:
+                partial = (partial * entry) % cls._P_BIG
+            if partial != 1:
+                result = (result * partial) % cls._P_BIG
+        return int(result)
+    
+    @classmethod
+    def multi_exp(cls, terms: Sequence[Tuple[int, int]]) -> int:
+        """
+        Simultaneous multi-exponentiation: prod(base_i^exponent_i) mod p.
+        Uses Straus' interleaved-window method, so all terms share one
+        chain of squarings (one per bit of the longest exponent) and each
+        term only adds a multiplication per MULTI_EXP_WINDOW bits.
+        
+        Args:
+            terms: Sequence of (base, exponent) pairs with exponent >= 0
+            
+        Returns:
+            Product of all base_i^exponent_i mod p
+        """
+        width = cls.MULTI_EXP_WINDOW
+        mask = (1 << width) - 1
+        
+        # Per-term table of base^k for k < 2^width
+        tables: List[List[Any]] = []
+        exponents: List[int] = []
+        for base, exponent in terms:
+            row = [1, base % cls._P_BIG]
+            for _ in range(2, 1 << width):
+                row.append((row[-1] * row[1]) % cls._P_BIG)
+            tables.append(row)
+            exponents.append(exponent)
+        
+        bits = max((exponent.bit_length() for exponent in exponents), default=0)
+        result = 1
+        for shift in range(((bits + width - 1) // width - 1) * width, -1, -width):
+            if result != 1:
+                for _ in range(width):
+                    result = (result * result) % cls._P_BIG
+            for row, exponent in zip(tables, exponents):
+                digit = (exponent >> shift) & mask
+                if digit:
+                    result = (result * row[digit]) % cls._P_BIG
+        return int(result)
+    
     @staticmethod
-    def hash_to_int(*values) -> int:
+    def hash_to_int(*values: object, hasher: Optional[Any] = None) -> int:
         """
         Hash multiple values to an integer using SHA-256.
         
+        Each value is length-prefixed so that different value sequences
+        can never produce the same input to the hash.
+        
         Args:
-            *values: Values to hash (will be converted to strings)
+            *values: Values to hash (integers are hashed as big-endian
+                     bytes, anything else as its UTF-8 string)
+            hasher: Optional pre-seeded SHA-256 object (e.g. holding a
+                    domain separation tag); a copy of it is used, so it
+                    can be shared between calls
             
         Returns:
             Integer hash value
         """
-        hasher = hashlib.sha256()
+        # Stream the transcript straight into the hash state rather than
+        # assembling it in an intermediate buffer
+        hasher = hasher.copy() if hasher is not None else hashlib.sha256()
         for value in values:
-            hasher.update(str(value).encode('utf-8'))
+            if isinstance(value, int):
+                encoded = value.to_bytes(value.bit_length() // 8 + 1,
+                                         byteorder='big', signed=True)
+            else:
+                encoded = str(value).encode('utf-8')
+            hasher.update(len(encoded).to_bytes(4, byteorder='big'))
+            hasher.update(encoded)
         return int.from_bytes(hasher.digest(), byteorder='big')
     
     @staticmethod
@@ -103,6 +310,37 @@ class CryptoUtils:
         """Convert bytes to integer."""
         return int.from_bytes(data, byteorder='big')
     
+    @classmethod
+    def legendre(cls, value: int) -> int:
+        """
+        Legendre symbol (value / p).
+        Since p is a safe prime, the order-q subgroup generated by g is
+        exactly the set of quadratic residues, so this is a cheap subgroup
+        membership test (much cheaper than checking value^q mod p).
+        
+        Args:
+            value: Value to test
+        
+        Returns:
+            1 if value is a nonzero square mod p, -1 if it is not a square,
+            0 if value is divisible by p
+        """
+        if gmpy2 is not None:
+            return int(gmpy2.legendre(value, cls._P_BIG))
+        # Binary Jacobi symbol algorithm
+        a, n = value % cls.P, cls.P
+        result = 1
+        while a:
+            while not a & 1:
+                a >>= 1
+                if n & 7 in (3, 5):
+                    result = -result
+            a, n = n, a
+            if a & 3 == 3 and n & 3 == 3:
+                result = -result
+            a %= n
+        return result if n == 1 else 0
+    
     @classmethod
     def get_parameters(cls) -> Tuple[int, int, int]:
         """
@@ -112,3 +350,7 @@ class CryptoUtils:
             Tuple of (prime p, generator g, order q)
         """
         return cls.P, cls.G, cls.Q
+
+
+# Group parameters as module constants for direct (global) lookups
+P, G, Q = CryptoUtils.get_parameters()
@@ -55,20 +55,21 @@ def init_demo_data():
         }
     ]
     
-    # Add students
-    for student in students:
-        success = db.add_student(
+    # Add students in a single transaction
+    added = db.add_students_bulk(
+        (
             student['student_id'],
             student['name'],
             student['email'],
             student['admission_year'],
             student['department']
         )
-        
-        if success:
-            print(f"✓ Added student: {student['student_id']} - {student['name']}")
-        else:
-            print(f"  Student {student['student_id']} already exists")
+        for student in students
+    )
+    
+    print(f"✓ Added {added} student(s)")
+    if added < len(students):
+        print(f"  {len(students) - added} student(s) already existed")
     
     db.close()
     print("\nDemo data initialization complete!")
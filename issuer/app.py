@@ -3,9 +3,9 @@ Flask application for issuer (college) layer.
 Provides APIs for student identity verification and credential issuance.
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import json
+from flask import Flask, Response, request, jsonify
+import orjson
+import base64
 import sys
 import os
 
@@ -14,12 +14,52 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from issuer.database import Database
 from issuer.credentials import CredentialManager
+from crypto.utils import CryptoUtils
+
+
+def _json_response(payload, status: int = 200) -> Response:
+    """Serialize a response body with orjson instead of jsonify."""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+
+def _read_public_key(data: dict):
+    """
+    Read the student's public key from a request body.
+    
+    Accepts either "public_key" (decimal string) or "public_key_b64"
+    (base64 of the big-endian key bytes, as produced by
+    KeyManager.serialize_public_key) and returns the decimal form that
+    key bindings and credentials store.
+    """
+    encoded_key = data.get('public_key_b64')
+    if encoded_key:
+        if not isinstance(encoded_key, str):
+            return None
+        try:
+            key_bytes = base64.b64decode(encoded_key, validate=True)
+        except ValueError:
+            return None
+        return str(CryptoUtils.bytes_to_int(key_bytes)) if key_bytes else None
+    return data.get('public_key')
 
 
 def create_app():
     """Create and configure the Flask application."""
     app = Flask(__name__)
-    CORS(app)  # Enable CORS for all routes
+    
+    @app.before_request
+    def cors_preflight():
+        """Answer CORS preflight requests without routing them."""
+        if request.method == 'OPTIONS':
+            return Response(status=204)
+    
+    @app.after_request
+    def add_cors_headers(response):
+        """Enable CORS for all routes."""
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+        return response
     
     # Initialize database and credential manager
     db = Database()
@@ -69,13 +109,13 @@ def create_app():
             {
                 "student_id": "STU001",
                 "name": "John Doe",
-                "public_key": "12345..."
+                "public_key": "12345..."   (or "public_key_b64": "base64...")
             }
         """
         data = request.get_json()
         student_id = data.get('student_id')
         name = data.get('name')
-        public_key = data.get('public_key')
+        public_key = _read_public_key(data)
         
         if not all([student_id, name, public_key]):
             return jsonify({'error': 'Missing required fields'}), 400
@@ -106,43 +146,41 @@ def create_app():
         Request body:
             {
                 "student_id": "STU001",
-                "public_key": "12345..."
+                "public_key": "12345..."   (or "public_key_b64": "base64...")
             }
         """
         data = request.get_json()
         student_id = data.get('student_id')
-        public_key = data.get('public_key')
+        public_key = _read_public_key(data)
         
         if not student_id or not public_key:
             return jsonify({'error': 'Missing student_id or public_key'}), 400
         
-        # Get student data
-        student = db.get_student(student_id)
+        # Get student data and bound public key
+        student, bound_key = db.get_student_and_bound_key(student_id)
         if not student:
             return jsonify({'error': 'Student not found'}), 404
         
         # Verify public key is bound
-        bound_key = db.get_public_key(student_id)
         if bound_key != public_key:
             return jsonify({'error': 'Public key not bound to this student'}), 401
         
         # Issue credential
         issued = cred_manager.issue_credential(student_id, public_key, student)
         
-        # Store credential
-        credential_json = json.dumps(issued['credential'])
+        # Store credential exactly as it was signed
         db.store_credential(
             student_id,
             public_key,
-            credential_json,
+            issued['credential_data'],
             issued['signature']
         )
         
-        return jsonify({
+        return _json_response({
             'success': True,
             'credential': issued['credential'],
             'signature': issued['signature']
-        }), 200
+        })
     
     @app.route('/credential/<student_id>', methods=['GET'])
     def get_credential(student_id):
@@ -155,12 +193,12 @@ def create_app():
         credential = db.get_credential(student_id)
         
         if credential:
-            return jsonify({
+            return _json_response({
                 'success': True,
-                'credential': json.loads(credential['credential_data']),
+                'credential': orjson.loads(credential['credential_data']),
                 'signature': credential['signature'],
                 'issued_at': credential['issued_at']
-            }), 200
+            })
         else:
             return jsonify({'error': 'Credential not found'}), 404
     
@@ -213,6 +251,7 @@ def create_app():
 
 
 if __name__ == '__main__':
+    # Development server; use issuer/wsgi.py for production deployments
     app = create_app()
     print("Starting Issuer (College) Server on http://localhost:5001")
     app.run(host='0.0.0.0', port=5001, debug=True)
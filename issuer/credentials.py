@@ -4,10 +4,15 @@ Handles credential creation, signing, and validation.
 """
 
 import json
-import hashlib
 import hmac
+import re
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
+
+
+# The only accepted signature encoding: a SHA-256 MAC as 64 lower-case
+# hex digits (bytes.fromhex alone would also accept spaces and upper case)
+_SIGNATURE_RE = re.compile('[0-9a-f]{64}')
 
 
 class CredentialManager:
@@ -21,6 +26,9 @@ class CredentialManager:
             secret_key: Secret key for signing credentials
         """
         self.secret_key = secret_key.encode('utf-8')
+        # Keyed HMAC state, copied per signature so the key pads are
+        # only derived once
+        self._hmac = hmac.new(self.secret_key, digestmod='sha256')
     
     def create_credential(self, student_id: str, public_key: str, 
                          student_data: Dict) -> Dict:
@@ -35,6 +43,7 @@ class CredentialManager:
         Returns:
             Credential dictionary
         """
+        now = datetime.utcnow()
         credential = {
             'student_id': student_id,
             'public_key': public_key,
@@ -42,48 +51,73 @@ class CredentialManager:
             'email': student_data.get('email'),
             'department': student_data.get('department'),
             'admission_year': student_data.get('admission_year'),
-            'issued_at': datetime.utcnow().isoformat(),
-            'expires_at': (datetime.utcnow() + timedelta(days=365)).isoformat(),
+            'issued_at': now.isoformat(),
+            'expires_at': (now + timedelta(days=365)).isoformat(),
             'issuer': 'College Verification System',
             'version': '1.0'
         }
         return credential
     
-    def sign_credential(self, credential: Dict) -> str:
+    @staticmethod
+    def _canonicalize(credential: Dict) -> bytes:
         """
-        Sign a credential using HMAC-SHA256.
+        Create the canonical representation of a credential.
         
         Args:
             credential: Credential dictionary
             
         Returns:
-            Signature (hex string)
+            Canonical JSON encoding (UTF-8 bytes) used for signing
+        """
+        return json.dumps(credential, sort_keys=True).encode('utf-8')
+    
+    def _mac(self, credential: Union[Dict, bytes]) -> bytes:
         """
-        # Create canonical representation
-        credential_str = json.dumps(credential, sort_keys=True)
+        Compute the raw HMAC-SHA256 of a credential.
         
-        # Generate HMAC signature
-        signature = hmac.new(
-            self.secret_key,
-            credential_str.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        Args:
+            credential: Credential dictionary, or its canonical bytes
+            
+        Returns:
+            32-byte MAC
+        """
+        # Create canonical representation unless already provided
+        if not isinstance(credential, bytes):
+            credential = self._canonicalize(credential)
         
-        return signature
+        mac = self._hmac.copy()
+        mac.update(credential)
+        return mac.digest()
     
-    def verify_signature(self, credential: Dict, signature: str) -> bool:
+    def sign_credential(self, credential: Union[Dict, bytes]) -> str:
+        """
+        Sign a credential using HMAC-SHA256.
+        
+        Args:
+            credential: Credential dictionary, or its canonical bytes
+            
+        Returns:
+            Signature (hex string)
+        """
+        return self._mac(credential).hex()
+    
+    def verify_signature(self, credential: Union[Dict, bytes], 
+                         signature: str) -> bool:
         """
         Verify a credential signature.
         
         Args:
-            credential: Credential dictionary
+            credential: Credential dictionary, or its canonical bytes
             signature: Signature to verify
             
         Returns:
             True if signature is valid, False otherwise
         """
-        expected_signature = self.sign_credential(credential)
-        return hmac.compare_digest(expected_signature, signature)
+        # Compare raw MAC bytes; signatures are only hex at the API boundary,
+        # and each MAC has exactly one accepted hex string
+        if not isinstance(signature, str) or not _SIGNATURE_RE.fullmatch(signature):
+            return False
+        return hmac.compare_digest(self._mac(credential), bytes.fromhex(signature))
     
     def issue_credential(self, student_id: str, public_key: str, 
                         student_data: Dict) -> Dict:
@@ -96,13 +130,15 @@ class CredentialManager:
             student_data: Student data
             
         Returns:
-            Dictionary with credential and signature
+            Dictionary with credential, its canonical JSON and signature
         """
         credential = self.create_credential(student_id, public_key, student_data)
-        signature = self.sign_credential(credential)
+        credential_data = self._canonicalize(credential)
+        signature = self.sign_credential(credential_data)
         
         return {
             'credential': credential,
+            'credential_data': credential_data.decode('utf-8'),
             'signature': signature
         }
     
@@ -120,8 +156,10 @@ class CredentialManager:
         try:
             credential = json.loads(credential_data)
             
-            # Verify signature
-            if not self.verify_signature(credential, signature):
+            # Verify signature over the stored bytes first; credentials
+            # stored before canonical storage need re-serializing
+            if not (self.verify_signature(credential_data.encode('utf-8'), signature)
+                    or self.verify_signature(credential, signature)):
                 return False
             
             # Check expiration
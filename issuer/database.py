@@ -4,23 +4,126 @@ Stores student records, credentials, and key bindings.
 """
 
 import sqlite3
+import queue
+import contextlib
 import json
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterable, Iterator, Tuple
 import os
 
 
+# SQL statements, defined once so sqlite3's statement cache reuses them
+_SQL_INSERT_STUDENT = '''
+    INSERT INTO students (student_id, name, email, admission_year, department)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_SQL_INSERT_STUDENT_OR_IGNORE = '''
+    INSERT OR IGNORE INTO students (student_id, name, email, admission_year, department)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_SQL_GET_STUDENT = 'SELECT * FROM students WHERE student_id = ?'
+_SQL_GET_ALL_STUDENTS = 'SELECT * FROM students ORDER BY student_id'
+_SQL_INSERT_KEY_BINDING = '''
+    INSERT INTO key_bindings (student_id, public_key)
+    VALUES (?, ?)
+'''
+_SQL_GET_PUBLIC_KEY = '''
+    SELECT public_key FROM key_bindings
+    WHERE student_id = ?
+    ORDER BY bound_at DESC
+    LIMIT 1
+'''
+_SQL_GET_STUDENT_AND_BOUND_KEY = '''
+    SELECT s.*, (
+        SELECT public_key FROM key_bindings
+        WHERE student_id = s.student_id
+        ORDER BY bound_at DESC
+        LIMIT 1
+    ) AS bound_public_key
+    FROM students s
+    WHERE s.student_id = ?
+'''
+_SQL_INSERT_CREDENTIAL = '''
+    INSERT INTO credentials (student_id, public_key, credential_data, signature)
+    VALUES (?, ?, ?, ?)
+'''
+_SQL_GET_CREDENTIAL = '''
+    SELECT * FROM credentials
+    WHERE student_id = ? AND status = 'active'
+    ORDER BY issued_at DESC
+    LIMIT 1
+'''
+
+
 class Database:
     """Database manager for college student records and credentials."""
     
+    # Maximum number of entries kept by the student read cache
+    CACHE_SIZE = 1024
+    
+    # Maximum number of idle connections kept for reuse
+    POOL_SIZE = 8
+    
     def __init__(self, db_path: str = "issuer/college.db"):
         """Initialize database connection."""
         self.db_path = db_path
         self._ensure_directory()
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self._pool: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue(self.POOL_SIZE)
+        # Per-process read cache for students that exist (misses are never
+        # cached, so rows added by another process are still found)
+        self._student_cache: Dict[str, Dict] = {}
         self._create_tables()
     
+    @contextlib.contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection from the pool, opening one if none is idle.
+        Connections are shared by whichever threads need them (Flask's
+        dev server uses a new thread per request), so the PRAGMA setup
+        and statement cache are reused; WAL mode still lets concurrent
+        borrowers read alongside the writer.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            # Never hand on a connection with a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a database connection tuned for concurrent access."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers run alongside the writer; NORMAL sync is safe
+        # in WAL mode and avoids an fsync on every commit
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        return conn
+    
+    def _cache_get(self, cache: Dict, key: str):
+        """Look up a cache entry, marking it as most recently used."""
+        value = cache.pop(key, None)
+        if value is not None:
+            cache[key] = value
+        return value
+    
+    def _cache_put(self, cache: Dict, key: str, value) -> None:
+        """Store a cache entry, evicting the least recently used one."""
+        cache[key] = value
+        if len(cache) > self.CACHE_SIZE:
+            cache.pop(next(iter(cache)), None)
+    
     def _ensure_directory(self):
         """Ensure database directory exists."""
         directory = os.path.dirname(self.db_path)
@@ -29,49 +132,71 @@ class Database:
     
     def _create_tables(self):
         """Create database tables if they don't exist."""
-        cursor = self.conn.cursor()
-        
-        # Students table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                student_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                admission_year INTEGER NOT NULL,
-                department TEXT NOT NULL,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Key bindings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS key_bindings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT NOT NULL,
-                public_key TEXT NOT NULL,
-                bound_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (student_id) REFERENCES students(student_id),
-                UNIQUE(student_id, public_key)
-            )
-        ''')
-        
-        # Credentials table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS credentials (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT NOT NULL,
-                public_key TEXT NOT NULL,
-                credential_data TEXT NOT NULL,
-                signature TEXT NOT NULL,
-                issued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP,
-                status TEXT DEFAULT 'active',
-                FOREIGN KEY (student_id) REFERENCES students(student_id)
-            )
-        ''')
-        
-        self.conn.commit()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            # Students table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS students (
+                    student_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    admission_year INTEGER NOT NULL,
+                    department TEXT NOT NULL,
+                    status TEXT DEFAULT 'active',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Key bindings table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS key_bindings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    student_id TEXT NOT NULL,
+                    public_key TEXT NOT NULL,
+                    bound_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (student_id) REFERENCES students(student_id),
+                    UNIQUE(student_id, public_key)
+                )
+            ''')
+            
+            # Credentials table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS credentials (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    student_id TEXT NOT NULL,
+                    public_key TEXT NOT NULL,
+                    credential_data TEXT NOT NULL,
+                    signature TEXT NOT NULL,
+                    issued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    expires_at TIMESTAMP,
+                    status TEXT DEFAULT 'active',
+                    FOREIGN KEY (student_id) REFERENCES students(student_id)
+                )
+            ''')
+            
+            # Indexes for the latest-binding and latest-credential lookups
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_kb_student_bound
+                ON key_bindings(student_id, bound_at DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_cred_student_issued
+                ON credentials(student_id, status, issued_at DESC)
+            ''')
+            
+            # Indexes for listing bindings and credentials newest first
+            # (view_database), so a LIMIT reads only the rows it returns
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_kb_bound_at
+                ON key_bindings(bound_at)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_cred_issued_at
+                ON credentials(issued_at)
+            ''')
+            
+            conn.commit()
     
     def add_student(self, student_id: str, name: str, email: str, 
                    admission_year: int, department: str) -> bool:
@@ -89,16 +214,31 @@ class Database:
             True if successful, False otherwise
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO students (student_id, name, email, admission_year, department)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (student_id, name, email, admission_year, department))
-            self.conn.commit()
+            with self._connection() as conn:
+                conn.execute(_SQL_INSERT_STUDENT,
+                             (student_id, name, email, admission_year, department))
+                conn.commit()
+            self._student_cache.pop(student_id, None)
             return True
         except sqlite3.IntegrityError:
             return False
     
+    def add_students_bulk(self, rows: Iterable[Tuple]) -> int:
+        """
+        Add many students in a single transaction.
+        Students that already exist are skipped.
+        
+        Args:
+            rows: Iterable of (student_id, name, email, admission_year,
+                  department) tuples
+        
+        Returns:
+            Number of students added
+        """
+        with self._connection() as conn, conn:
+            cursor = conn.executemany(_SQL_INSERT_STUDENT_OR_IGNORE, rows)
+        return cursor.rowcount
+    
     def get_student(self, student_id: str) -> Optional[Dict]:
         """
         Get student information.
@@ -109,10 +249,16 @@ class Database:
         Returns:
             Dictionary with student data or None
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM students WHERE student_id = ?', (student_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        student = self._cache_get(self._student_cache, student_id)
+        if student is None:
+            with self._connection() as conn:
+                row = conn.execute(_SQL_GET_STUDENT, (student_id,)).fetchone()
+            if not row:
+                return None
+            student = dict(row)
+            self._cache_put(self._student_cache, student_id, student)
+        # Copy so callers cannot modify the cached row
+        return dict(student)
     
     def verify_student_identity(self, student_id: str, name: str) -> bool:
         """
@@ -142,12 +288,9 @@ class Database:
             True if successful, False otherwise
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO key_bindings (student_id, public_key)
-                VALUES (?, ?)
-            ''', (student_id, public_key))
-            self.conn.commit()
+            with self._connection() as conn:
+                conn.execute(_SQL_INSERT_KEY_BINDING, (student_id, public_key))
+                conn.commit()
             return True
         except sqlite3.IntegrityError:
             return False
@@ -162,16 +305,27 @@ class Database:
         Returns:
             Public key or None
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT public_key FROM key_bindings 
-            WHERE student_id = ? 
-            ORDER BY bound_at DESC 
-            LIMIT 1
-        ''', (student_id,))
-        row = cursor.fetchone()
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_PUBLIC_KEY, (student_id,)).fetchone()
         return row['public_key'] if row else None
     
+    def get_student_and_bound_key(self, student_id: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Get student information and the bound public key in one query.
+        
+        Args:
+            student_id: Student ID
+            
+        Returns:
+            Tuple of (student data or None, public key or None)
+        """
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_STUDENT_AND_BOUND_KEY, (student_id,)).fetchone()
+        if not row:
+            return None, None
+        student = dict(row)
+        return student, student.pop('bound_public_key')
+    
     def store_credential(self, student_id: str, public_key: str, 
                         credential_data: str, signature: str) -> int:
         """
@@ -186,12 +340,10 @@ class Database:
         Returns:
             Credential ID
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO credentials (student_id, public_key, credential_data, signature)
-            VALUES (?, ?, ?, ?)
-        ''', (student_id, public_key, credential_data, signature))
-        self.conn.commit()
+        with self._connection() as conn:
+            cursor = conn.execute(_SQL_INSERT_CREDENTIAL,
+                                  (student_id, public_key, credential_data, signature))
+            conn.commit()
         return cursor.lastrowid
     
     def get_credential(self, student_id: str) -> Optional[Dict]:
@@ -204,22 +356,20 @@ class Database:
         Returns:
             Dictionary with credential data or None
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT * FROM credentials 
-            WHERE student_id = ? AND status = 'active'
-            ORDER BY issued_at DESC 
-            LIMIT 1
-        ''', (student_id,))
-        row = cursor.fetchone()
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_CREDENTIAL, (student_id,)).fetchone()
         return dict(row) if row else None
     
     def get_all_students(self) -> List[Dict]:
         """Get all students."""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM students ORDER BY student_id')
-        return [dict(row) for row in cursor.fetchall()]
+        with self._connection() as conn:
+            rows = conn.execute(_SQL_GET_ALL_STUDENTS).fetchall()
+        return [dict(row) for row in rows]
     
     def close(self):
-        """Close database connection."""
-        self.conn.close()
+        """Close all idle pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,21 @@
+"""
+WSGI entry point for issuer (college) layer.
+Serves the Flask application with a production server instead of the
+single-threaded development server started by issuer/app.py, e.g.:
+
+    gunicorn -w $(nproc) -k gthread --threads 4 -b 0.0.0.0:5001 issuer.wsgi:app
+
+Each worker process builds its own app with its own small pool of SQLite
+connections, which its threads borrow per query and share (the database
+runs in WAL mode, so readers do not block the writer).
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from issuer.app import create_app
+
+app = create_app()
@@ -88,9 +88,10 @@ function generateCommitment() {
     // Compute t = g^r mod p
     const t = modPow(G, r, P);
 
+    // Commitment is sent as hex, which the verifier parses in linear time
     return {
         r: r.toString(),
-        commitment: t.toString()
+        commitment: '0x' + t.toString(16)
     };
 }
 
@@ -105,7 +106,7 @@ function generateResponse(r, challenge, privateKey) {
     // Compute s = (r + c*x) mod q
     const s = (rBig + cBig * xBig) % Q;
 
-    return s.toString();
+    return '0x' + s.toString(16);
 }
 
 /**
@@ -5,12 +5,15 @@ Test if both servers are responding correctly.
 import requests
 import json
 
+# One session for all requests, so connections to each server are reused
+session = requests.Session()
+
 print("Testing ZKP System Servers...\n")
 
 # Test Issuer Server
 print("1. Testing Issuer Server (http://localhost:5001)")
 try:
-    response = requests.get('http://localhost:5001/health')
+    response = session.get('http://localhost:5001/health')
     if response.status_code == 200:
         print("   ✓ Issuer server is running!")
         print(f"   Response: {response.json()}")
@@ -24,7 +27,7 @@ print()
 # Test Verifier Server
 print("2. Testing Verifier Server (http://localhost:5002)")
 try:
-    response = requests.get('http://localhost:5002/health')
+    response = session.get('http://localhost:5002/health')
     if response.status_code == 200:
         print("   ✓ Verifier server is running!")
         print(f"   Response: {response.json()}")
@@ -38,7 +41,7 @@ print()
 # Test student verification
 print("3. Testing Student Identity Verification")
 try:
-    response = requests.post(
+    response = session.post(
         'http://localhost:5001/verify-identity',
         json={
             'student_id': 'STU001',
@@ -10,6 +10,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from crypto.schnorr import SchnorrZKP
 from crypto.keys import KeyManager
 from crypto.utils import CryptoUtils
+from verifier import verification
+from verifier.verification import ZKPVerifier, _to_int
 
 
 def test_key_generation():
@@ -198,6 +200,177 @@ def test_multiple_proofs():
     print("✓ Multiple proofs test passed (5 proofs verified)")
 
 
+def test_fixed_base_exp():
+    """Test fixed-base exponentiation against built-in pow."""
+    print("\nTesting fixed-base exponentiation...")
+    p, g, q = CryptoUtils.get_parameters()
+    
+    exponents = [0, 1, q - 1, q, q + 5, 2 * q + 3]
+    exponents += [CryptoUtils.generate_random_in_range(q) for _ in range(5)]
+    
+    for x in exponents:
+        assert CryptoUtils.fixed_base_exp(x) == pow(g, x, p), \
+            f"Fixed-base exponentiation mismatch for exponent {x}"
+    
+    print("✓ Fixed-base exponentiation test passed")
+
+
+def test_cached_base_exp():
+    """Test cached-table exponentiation against built-in pow."""
+    print("\nTesting cached-base exponentiation...")
+    p, g, q = CryptoUtils.get_parameters()
+    km = KeyManager()
+    _, public_key = km.generate_keypair()
+    
+    # Short exponents use the cached table, longer ones fall back to pow
+    exponents = [0, 1, 15, 16, (1 << 256) - 1, 1 << 256, q - 1]
+    exponents += [CryptoUtils.generate_random(256) for _ in range(5)]
+    
+    for c in exponents:
+        assert CryptoUtils.cached_base_exp(public_key, c) == pow(public_key, c, p), \
+            f"Cached-base exponentiation mismatch for exponent {c}"
+    
+    print("✓ Cached-base exponentiation test passed")
+
+
+def test_multi_exp():
+    """Test simultaneous multi-exponentiation against built-in pow."""
+    print("\nTesting multi-exponentiation...")
+    p, g, q = CryptoUtils.get_parameters()
+    
+    terms = [(CryptoUtils.generate_random_in_range(p), CryptoUtils.generate_random(bits))
+             for bits in (1, 5, 128, 384, 2047)]
+    terms.append((g, 0))
+    
+    expected = 1
+    for base, exponent in terms:
+        expected = (expected * pow(base, exponent, p)) % p
+    
+    assert CryptoUtils.multi_exp(terms) == expected, "Multi-exponentiation mismatch"
+    assert CryptoUtils.multi_exp([]) == 1, "Empty product should be 1"
+    
+    print("✓ Multi-exponentiation test passed")
+
+
+def test_batch_verification():
+    """Test batch verification of several proofs."""
+    print("\nTesting batch verification...")
+    zkp = SchnorrZKP()
+    km = KeyManager()
+    p = zkp.p
+    
+    items = []
+    for _ in range(4):
+        private_key, public_key = km.generate_keypair()
+        challenge = zkp.generate_challenge()
+        proof = zkp.create_proof(private_key, challenge)
+        items.append((proof['commitment'], proof['response'], challenge, public_key))
+    
+    assert zkp.verify_batch(items), "Valid batch should verify"
+    
+    # One wrong response invalidates the batch
+    t, s, c, y = items[2]
+    bad_items = items[:2] + [(t, s + 1, c, y)] + items[3:]
+    assert not zkp.verify_batch(bad_items), "Batch with bad proof should fail"
+    
+    # Negated commitment (outside the subgroup) must not slip through
+    bad_items = items[:2] + [(p - t, s, c, y)] + items[3:]
+    assert not zkp.verify_batch(bad_items), "Batch with negated commitment should fail"
+    
+    # Fiat-Shamir batch: challenges are re-derived from each transcript
+    ni_items = []
+    for index in range(4):
+        private_key, public_key = km.generate_keypair()
+        message = f"message {index}"
+        proof = zkp.create_non_interactive_proof(private_key, public_key, message)
+        ni_items.append((proof, public_key, message))
+    assert zkp.verify_non_interactive_batch(ni_items), "Valid Fiat-Shamir batch should verify"
+    
+    proof, public_key, message = ni_items[1]
+    tampered = dict(proof, response=(proof['response'] + 1) % zkp.q)
+    bad_ni = ni_items[:1] + [(tampered, public_key, message)] + ni_items[2:]
+    assert not zkp.verify_non_interactive_batch(bad_ni), "Tampered response should fail"
+    bad_ni = ni_items[:1] + [(proof, public_key, "other message")] + ni_items[2:]
+    assert not zkp.verify_non_interactive_batch(bad_ni), "Changed message should fail"
+    
+    # ZKPVerifier rejects t + p, which the combined check would reduce mod p
+    verifier = ZKPVerifier()
+    str_items = [tuple(str(value) for value in item) for item in items]
+    assert verifier.verify_proofs_batch(str_items), "Valid string batch should verify"
+    t, s, c, y = items[0]
+    bad_items = [(str(t + p), str(s), str(c), str(y))] + str_items[1:]
+    assert not verifier.verify_proofs_batch(bad_items), "Commitment t + p should be rejected"
+    
+    print("✓ Batch verification test passed")
+
+
+def test_to_int():
+    """Test parsing of proof values and public keys."""
+    print("\nTesting integer parsing...")
+    value = 0x1234ABCD
+    
+    assert _to_int(hex(value)) == value, "Hex should parse"
+    assert _to_int("0X1234abcd") == value, "Upper-case hex prefix should parse"
+    assert _to_int(str(value)) == value, "Decimal should parse"
+    assert _to_int("+123") == 123, "Signed decimal should parse as decimal"
+    assert _to_int("b64:EjSrzQ==") == value, "Prefixed base64 should parse"
+    assert _to_int(value.to_bytes(4, byteorder='big')) == value, "Bytes should parse"
+    assert _to_int(value) == value, "Integers should pass through"
+    # Digit-only base64 is still read as decimal unless marked
+    assert _to_int("1234") == 1234, "Unprefixed digits should be decimal"
+    
+    for bad in ("EjSrzQ==", "b64:", "b64:not base64!", "0xzz", "", "12a"):
+        try:
+            _to_int(bad)
+            assert False, f"{bad!r} should be rejected"
+        except ValueError:
+            pass
+    try:
+        _to_int(None)
+        assert False, "None should be rejected"
+    except TypeError:
+        pass
+    
+    print("✓ Integer parsing test passed")
+
+
+def test_verify_many():
+    """Test parallel verification of many independent proofs."""
+    print("\nTesting parallel verification...")
+    zkp = SchnorrZKP()
+    km = KeyManager()
+    verifier = ZKPVerifier()
+    
+    private_key, public_key = km.generate_keypair()
+    items = []
+    for _ in range(verification.PARALLEL_VERIFY_THRESHOLD):
+        challenge = zkp.generate_challenge()
+        proof = zkp.create_proof(private_key, challenge)
+        items.append((str(proof['commitment']), str(proof['response']),
+                      str(challenge), str(public_key)))
+    
+    # Tamper with one response
+    bad_index = 17
+    t, s, c, y = items[bad_index]
+    items[bad_index] = (t, str((int(s) + 1) % zkp.q), c, y)
+    
+    # Report two CPUs so the process pool is used even on one core
+    cpu_count = verification.os.cpu_count
+    verification.os.cpu_count = lambda: 2
+    try:
+        results = verifier.verify_many(items)
+    finally:
+        verification.os.cpu_count = cpu_count
+    
+    assert verification._verify_pool is not None, "Process pool should be used"
+    assert len(results) == len(items), "One result per proof"
+    assert results[bad_index] is False, "Tampered proof should fail"
+    assert all(results[:bad_index]) and all(results[bad_index + 1:]), \
+        "All other proofs should verify"
+    
+    print("✓ Parallel verification test passed")
+
+
 def run_all_tests():
     """Run all tests."""
     print("=" * 60)
@@ -213,6 +386,12 @@ def run_all_tests():
         test_non_interactive_proof()
         test_key_serialization()
         test_multiple_proofs()
+        test_fixed_base_exp()
+        test_cached_base_exp()
+        test_multi_exp()
+        test_batch_verification()
+        test_to_int()
+        test_verify_many()
         
         print("\n" + "=" * 60)
         print("✓ ALL TESTS PASSED!")
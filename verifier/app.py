@@ -3,21 +3,81 @@ Flask application for verifier (scholarship backend) layer.
 Provides APIs for ZKP verification and eligibility checking.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import orjson
+import threading
 import sys
 import os
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from verifier.registry import PublicKeyRegistry
-from verifier.verification import ZKPVerifier
+from verifier.registry import PublicKeyRegistry, encode_public_key, decode_public_key
+from verifier.verification import get_verifier
 from verifier.eligibility import EligibilityEngine
 from issuer.credentials import CredentialManager
 
 
+# Credential batches at least this large are validated in a process pool;
+# smaller ones are cheaper to check inline than to ship to workers
+PARALLEL_VALIDATION_THRESHOLD = 1024
+
+# Largest proof batch accepted by /verify-proofs-batch; bisecting an
+# all-invalid batch costs about 2n batch checks
+MAX_PROOF_BATCH_SIZE = 256
+
+_validation_pool: Optional[ProcessPoolExecutor] = None
+_validation_pool_lock = threading.Lock()
+_worker_cred_manager: Optional[CredentialManager] = None
+
+
+def _json_response(payload, status: int = 200) -> Response:
+    """Serialize a response body with orjson instead of jsonify."""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+
+def _init_validation_worker(secret_key: str):
+    """Create the credential manager used by a validation worker process."""
+    global _worker_cred_manager
+    _worker_cred_manager = CredentialManager(secret_key)
+
+
+def _validate_in_worker(item: Tuple[str, str]) -> bool:
+    """Validate one (credential_data, signature) pair in a worker process."""
+    assert _worker_cred_manager is not None, "worker not initialized"
+    return _worker_cred_manager.validate_credential(*item)
+
+
+def _validate_credentials(cred_manager: CredentialManager,
+                          items: List[Tuple[str, str]]) -> List[bool]:
+    """
+    Validate many credentials, using all cores for large batches.
+    
+    Args:
+        cred_manager: Credential manager holding the issuer key
+        items: List of (credential_data, signature) pairs
+        
+    Returns:
+        List with the validation result of each pair
+    """
+    global _validation_pool
+    workers = os.cpu_count() or 1
+    if workers == 1 or len(items) < PARALLEL_VALIDATION_THRESHOLD:
+        return [cred_manager.validate_credential(*item) for item in items]
+    
+    with _validation_pool_lock:
+        if _validation_pool is None:
+            _validation_pool = ProcessPoolExecutor(
+                initializer=_init_validation_worker,
+                initargs=(cred_manager.secret_key.decode('utf-8'),)
+            )
+    chunksize = max(1, len(items) // (4 * workers))
+    return list(_validation_pool.map(_validate_in_worker, items, chunksize=chunksize))
+
+
 def create_app():
     """Create and configure the Flask application."""
     app = Flask(__name__)
@@ -25,7 +85,7 @@ def create_app():
     
     # Initialize components
     registry = PublicKeyRegistry()
-    zkp_verifier = ZKPVerifier()
+    zkp_verifier = get_verifier()
     eligibility_engine = EligibilityEngine()
     cred_manager = CredentialManager()  # For validating credentials
     
@@ -54,10 +114,13 @@ def create_app():
             return jsonify({'error': 'Missing required fields'}), 400
         
         # Register ONLY the public key (no personal data!)
-        success = registry.register_public_key_only(
-            student_id,
-            public_key
-        )
+        try:
+            success = registry.register_public_key_only(
+                student_id,
+                public_key
+            )
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid public key'}), 400
         
         return jsonify({
             'success': success,
@@ -75,6 +138,75 @@ def create_app():
             'privacy_note': 'We do not store credential data to protect your privacy.'
         }), 410  # 410 Gone
     
+    @app.route('/register-credentials-batch', methods=['POST'])
+    def register_credentials_batch():
+        """
+        Register the public keys of many issuer-signed credentials at once.
+        Each credential's signature is checked, but ONLY the public key is
+        stored (no credential data, as with /register-public-key).
+        
+        Request body:
+            {
+                "credentials": [
+                    {
+                        "credential_data": "{...}",  # Credential JSON
+                        "signature": "abc..."
+                    },
+                    ...
+                ]
+            }
+        """
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        entries = data.get('credentials')
+        
+        if not entries or not isinstance(entries, list):
+            return jsonify({'error': 'Missing required fields'}), 400
+        
+        results = [None] * len(entries)
+        indices = []
+        items = []
+        for index, entry in enumerate(entries):
+            credential_data = entry.get('credential_data') if isinstance(entry, dict) else None
+            signature = entry.get('signature') if isinstance(entry, dict) else None
+            
+            if not isinstance(credential_data, str) or not isinstance(signature, str):
+                results[index] = {'registered': False, 'error': 'Missing required fields'}
+                continue
+            indices.append(index)
+            items.append((credential_data, signature))
+        
+        rows = []
+        for index, (credential_data, _), is_valid in zip(
+                indices, items, _validate_credentials(cred_manager, items)):
+            if not is_valid:
+                results[index] = {'registered': False, 'error': 'Invalid credential'}
+                continue
+            
+            credential = orjson.loads(credential_data)
+            student_id = credential.get('student_id') if isinstance(credential, dict) else None
+            if not isinstance(student_id, str) or not student_id:
+                results[index] = {'registered': False, 'error': 'Invalid student_id'}
+                continue
+            try:
+                encode_public_key(credential.get('public_key'))
+            except (ValueError, TypeError):
+                results[index] = {'registered': False, 'error': 'Invalid public key'}
+                continue
+            
+            # Store ONLY the public key (no personal data!)
+            rows.append((student_id, credential['public_key'],
+                         '{}', 'N/A', 'College'))
+            results[index] = {'registered': True}
+        
+        registered = registry.register_public_keys(rows) if rows else 0
+        
+        return jsonify({
+            'registered': registered,
+            'results': results
+        }), 200
+    
     @app.route('/request-challenge', methods=['POST'])
     def request_challenge():
         """
@@ -101,11 +233,14 @@ def create_app():
         session = zkp_verifier.generate_challenge_session()
         
         # Store challenge in registry (NO student ID!)
-        registry.store_challenge(
+        stored = registry.store_challenge(
             session['session_id'],
             session['challenge'],
             student_id=None  # Privacy: don't link to student ID
         )
+        # A challenge that was not stored could never be answered
+        if not stored:
+            return jsonify({'error': 'Could not create challenge session'}), 503
         
         return jsonify({
             'session_id': session['session_id'],
@@ -119,7 +254,7 @@ def create_app():
         
         Request body:
             {
-                "session_id": "uuid",
+                "session_id": "9f86d081884c7d65...",
                 "student_id": "STU001",
                 "proof": {
                     "commitment": "123...",
@@ -159,6 +294,95 @@ def create_app():
             'message': 'Proof verified successfully' if is_valid else 'Proof verification failed'
         }), 200
     
+    @app.route('/verify-proofs-batch', methods=['POST'])
+    def verify_proofs_batch():
+        """
+        Verify several queued ZKP proofs at once.
+        
+        Request body:
+            {
+                "proofs": [
+                    {
+                        "session_id": "9f86d081884c7d65...",
+                        "student_id": "STU001",
+                        "proof": {
+                            "commitment": "123...",
+                            "response": "456..."
+                        }
+                    },
+                    ...
+                ]
+            }
+        """
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        entries = data.get('proofs')
+        
+        if not entries or not isinstance(entries, list):
+            return jsonify({'error': 'Missing required fields'}), 400
+        if len(entries) > MAX_PROOF_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_PROOF_BATCH_SIZE} proofs per batch'}), 400
+        
+        results = [None] * len(entries)
+        pending = []
+        seen_sessions = set()
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                results[index] = {'verified': False, 'error': 'Missing required fields'}
+                continue
+            session_id = entry.get('session_id')
+            student_id = entry.get('student_id')
+            proof = entry.get('proof')
+            
+            if (not isinstance(session_id, str) or not isinstance(student_id, str)
+                    or not all([session_id, student_id, proof]) or not isinstance(proof, dict)):
+                results[index] = {'verified': False, 'error': 'Missing required fields'}
+                continue
+            
+            # Each challenge can be answered once, including within a batch
+            if session_id in seen_sessions:
+                results[index] = {'verified': False, 'error': 'Duplicate session in batch'}
+                continue
+            seen_sessions.add(session_id)
+            
+            challenge = registry.get_challenge(session_id)
+            if not challenge:
+                results[index] = {'verified': False, 'error': 'Invalid or expired session'}
+                continue
+            
+            key_data = registry.get_public_key(student_id)
+            if not key_data:
+                results[index] = {'verified': False, 'error': 'Student not registered'}
+                continue
+            
+            pending.append((index, session_id, proof, challenge, key_data['public_key']))
+        
+        # One combined check for all proofs; bisects only if it fails
+        verified = zkp_verifier.verify_batch_detailed(
+            [item[2] for item in pending],
+            [item[3] for item in pending],
+            [item[4] for item in pending]
+        )
+        
+        verified_count = 0
+        for (index, session_id, _, _, _), is_valid in zip(pending, verified):
+            # Mark challenge as used; a proof only counts if this request
+            # is the one that used the challenge
+            if is_valid and not registry.mark_challenge_used(session_id):
+                results[index] = {'verified': False, 'error': 'Invalid or expired session'}
+                continue
+            verified_count += is_valid
+            results[index] = {
+                'verified': is_valid,
+                'message': 'Proof verified successfully' if is_valid else 'Proof verification failed'
+            }
+        
+        return jsonify({
+            'results': results,
+            'verified_count': verified_count
+        }), 200
+    
     @app.route('/check-eligibility', methods=['POST'])
     def check_eligibility():
         """
@@ -167,7 +391,7 @@ def create_app():
         
         Request body:
             {
-                "session_id": "uuid",
+                "session_id": "9f86d081884c7d65...",
                 "public_key": "12345...",
                 "proof": {
                     "commitment": "123...",
@@ -212,7 +436,7 @@ def create_app():
             'privacy_note': 'No student ID or personal details were disclosed to the scholarship provider!'
         }
         
-        return jsonify(decision), 200
+        return _json_response(decision)
     
     @app.route('/registry/<student_id>', methods=['GET'])
     def get_registry_entry(student_id):
@@ -225,12 +449,12 @@ def create_app():
         key_data = registry.get_public_key(student_id)
         
         if key_data:
-            return jsonify({
+            return _json_response({
                 'student_id': key_data['student_id'],
-                'public_key': key_data['public_key'],
-                'credential': json.loads(key_data['credential_data']),
+                'public_key': str(decode_public_key(key_data['public_key'])),
+                'credential': registry.get_parsed_credential(student_id),
                 'registered_at': key_data['registered_at']
-            }), 200
+            })
         else:
             return jsonify({'error': 'Student not found in registry'}), 404
     
@@ -239,12 +463,14 @@ def create_app():
         """Get all eligibility decisions."""
         student_id = request.args.get('student_id')
         decisions = eligibility_engine.get_decision_history(student_id)
-        return jsonify({'decisions': decisions}), 200
+        return _json_response({'decisions': decisions})
     
     return app
 
 
 if __name__ == '__main__':
+    # Development server; use verifier/wsgi.py for production deployments.
+    # Debug mode (reloader and interactive debugger) only with FLASK_DEBUG=1
     app = create_app()
     print("Starting Verifier (Scholarship Backend) Server on http://localhost:5002")
-    app.run(host='0.0.0.0', port=5002, debug=True)
+    app.run(host='0.0.0.0', port=5002, debug=os.environ.get('FLASK_DEBUG') == '1')
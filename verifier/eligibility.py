@@ -4,16 +4,28 @@ Determines scholarship grant/deny based on verification results.
 """
 
 import json
+from collections import deque
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Deque, Dict, Optional
+
+
+# Fields every credential must carry, in the order they are reported;
+# the frozenset is used for the membership check
+_REQUIRED_FIELD_ORDER = ('student_id', 'name', 'department', 'admission_year')
+_REQUIRED_FIELDS = frozenset(_REQUIRED_FIELD_ORDER)
 
 
 class EligibilityEngine:
     """Engine for making scholarship eligibility decisions."""
     
+    # Number of most recent decisions kept in memory
+    MAX_DECISIONS = 10_000
+    
     def __init__(self):
         """Initialize eligibility engine."""
-        self.decisions = []
+        self.decisions: Deque[Dict] = deque(maxlen=self.MAX_DECISIONS)
+        # Same decisions indexed by student ID, oldest first
+        self._by_student: Dict[str, Deque[Dict]] = {}
     
     def check_eligibility(self, student_id: str, credential: Dict, 
                          proof_verified: bool) -> Dict:
@@ -32,24 +44,32 @@ class EligibilityEngine:
         eligible = True
         reasons = []
         
-        # Must have valid proof
+        # Must have valid proof; the credential is not inspected otherwise
         if not proof_verified:
             eligible = False
             reasons.append("ZKP proof verification failed")
             return self._create_decision(student_id, eligible, reasons)
         
+        # Must have a credential to inspect
+        if not isinstance(credential, dict):
+            reasons.append("Missing or malformed credential")
+            return self._create_decision(student_id, False, reasons)
+        
+        # Read the clock once for the rest of the decision
+        now = datetime.utcnow()
+        
         # Check credential validity
         try:
             # Check if credential has required fields
-            required_fields = ['student_id', 'name', 'department', 'admission_year']
-            for field in required_fields:
-                if field not in credential:
-                    eligible = False
-                    reasons.append(f"Missing required field: {field}")
+            missing = _REQUIRED_FIELDS.difference(credential)
+            if missing:
+                eligible = False
+                reasons.extend(f"Missing required field: {field}"
+                               for field in _REQUIRED_FIELD_ORDER if field in missing)
             
             # Check admission year (example: must be within last 5 years)
             if eligible and 'admission_year' in credential:
-                current_year = datetime.now().year
+                current_year = now.year
                 admission_year = credential['admission_year']
                 
                 if current_year - admission_year > 5:
@@ -59,7 +79,7 @@ class EligibilityEngine:
             # Check if credential is expired
             if 'expires_at' in credential:
                 expires_at = datetime.fromisoformat(credential['expires_at'])
-                if datetime.utcnow() > expires_at:
+                if now > expires_at:
                     eligible = False
                     reasons.append("Credential expired")
             
@@ -72,10 +92,10 @@ class EligibilityEngine:
             eligible = False
             reasons.append(f"Error checking eligibility: {str(e)}")
         
-        return self._create_decision(student_id, eligible, reasons)
+        return self._create_decision(student_id, eligible, reasons, now)
     
     def _create_decision(self, student_id: str, eligible: bool, 
-                        reasons: list) -> Dict:
+                        reasons: list, now: Optional[datetime] = None) -> Dict:
         """
         Create an eligibility decision.
         
@@ -83,6 +103,7 @@ class EligibilityEngine:
             student_id: Student ID
             eligible: Whether eligible
             reasons: List of reasons
+            now: Decision time (UTC), defaults to the current time
             
         Returns:
             Decision dictionary
@@ -92,11 +113,19 @@ class EligibilityEngine:
             'eligible': eligible,
             'decision': 'GRANT' if eligible else 'DENY',
             'reasons': reasons,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': (now or datetime.utcnow()).isoformat()
         }
         
-        # Store decision
+        # Store decision, dropping the oldest one from the index as well
+        # when the history is full
+        if len(self.decisions) == self.decisions.maxlen:
+            oldest = self.decisions[0]
+            history = self._by_student[oldest['student_id']]
+            history.popleft()
+            if not history:
+                del self._by_student[oldest['student_id']]
         self.decisions.append(decision)
+        self._by_student.setdefault(student_id, deque()).append(decision)
         
         return decision
     
@@ -111,8 +140,8 @@ class EligibilityEngine:
             List of decisions
         """
         if student_id:
-            return [d for d in self.decisions if d['student_id'] == student_id]
-        return self.decisions
+            return list(self._by_student.get(student_id, ()))
+        return list(self.decisions)
     
     def apply_custom_criteria(self, credential: Dict, 
                              criteria: Dict) -> tuple[bool, list]:
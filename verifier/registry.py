@@ -4,23 +4,174 @@ Stores and manages issuer-certified public keys.
 """
 
 import sqlite3
+import threading
+import queue
+import contextlib
 import json
+import orjson
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Union, Iterable, Iterator, Tuple
 import os
 
+from crypto.utils import P
+
+
+# Public keys are stored as fixed-width big-endian BLOBs
+PUBLIC_KEY_BYTES = (P.bit_length() + 7) // 8
+
+
+# SQL statements, defined once so sqlite3's statement cache reuses them
+_SQL_INSERT_KEY = '''
+    INSERT INTO certified_keys 
+    (student_id, public_key, credential_data, signature, issuer)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_SQL_REPLACE_KEY = '''
+    INSERT OR REPLACE INTO certified_keys 
+    (student_id, public_key, credential_data, signature, issuer)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_SQL_UPDATE_KEY_ONLY = '''
+    UPDATE certified_keys 
+    SET public_key = ?, registered_at = CURRENT_TIMESTAMP
+    WHERE student_id = ?
+'''
+_SQL_UPDATE_KEY = '''
+    UPDATE certified_keys 
+    SET public_key = ?, credential_data = ?, signature = ?, 
+        registered_at = CURRENT_TIMESTAMP
+    WHERE student_id = ?
+'''
+_SQL_GET_BY_STUDENT_ID = '''
+    SELECT * FROM certified_keys 
+    WHERE student_id = ? AND verified = 1
+'''
+_SQL_GET_CREDENTIAL_DATA = '''
+    SELECT credential_data FROM certified_keys 
+    WHERE student_id = ? AND verified = 1
+'''
+_SQL_GET_BY_PUBLIC_KEY = '''
+    SELECT * FROM certified_keys 
+    WHERE public_key = ? AND verified = 1
+'''
+_SQL_INSERT_CHALLENGE = '''
+    INSERT INTO verification_sessions 
+    (session_id, student_id, challenge, expires_at)
+    VALUES (?, ?, ?, ?)
+'''
+_SQL_GET_CHALLENGE = '''
+    SELECT challenge FROM verification_sessions
+    WHERE session_id = ? AND used = 0 AND expires_at > ?
+'''
+_SQL_GET_TEXT_KEYS = '''
+    SELECT id, public_key FROM certified_keys WHERE typeof(public_key) = 'text'
+'''
+_SQL_SET_KEY_BLOB = 'UPDATE certified_keys SET public_key = ? WHERE id = ?'
+_SQL_DISABLE_KEY = 'UPDATE certified_keys SET verified = 0 WHERE id = ?'
+_SQL_MARK_CHALLENGE_USED = '''
+    UPDATE verification_sessions 
+    SET used = 1 
+    WHERE session_id = ? AND used = 0
+'''
+
+
+def encode_public_key(public_key: Union[str, int, bytes]) -> bytes:
+    """
+    Encode a public key for storage.
+    
+    Args:
+        public_key: Public key as a decimal string, integer or its
+                    big-endian bytes
+        
+    Returns:
+        PUBLIC_KEY_BYTES-long big-endian encoding of the key
+        
+    Raises:
+        ValueError: If the value is not a valid public key (1 < y < p)
+    """
+    if isinstance(public_key, bytes):
+        value = int.from_bytes(public_key, byteorder='big')
+    else:
+        value = int(public_key)
+    if not 1 < value < P:
+        raise ValueError("Public key out of range")
+    return value.to_bytes(PUBLIC_KEY_BYTES, byteorder='big')
+
+
+def decode_public_key(data: bytes) -> int:
+    """Decode a stored public key."""
+    return int.from_bytes(data, byteorder='big')
+
+
+class _PendingWrite:
+    """A challenge row waiting for the writer thread to commit it."""
+    
+    __slots__ = ('params', 'done', 'success')
+    
+    def __init__(self, params: tuple):
+        self.params = params
+        self.done = threading.Event()
+        self.success = False
+
 
 class PublicKeyRegistry:
     """Registry for storing and validating issuer-certified public keys."""
     
+    # Group commit limits for challenge writes: at most WRITE_BATCH_SIZE
+    # already-queued rows per transaction; callers give up on the writer
+    # after WRITE_TIMEOUT seconds
+    WRITE_BATCH_SIZE = 64
+    WRITE_TIMEOUT = 5.0
+    
+    # Maximum number of idle connections kept for reuse
+    POOL_SIZE = 8
+    
     def __init__(self, db_path: str = "verifier/registry.db"):
         """Initialize registry database."""
         self.db_path = db_path
         self._ensure_directory()
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self._pool: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue(self.POOL_SIZE)
+        self._write_queue: 'queue.Queue[_PendingWrite]' = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
         self._create_tables()
     
+    @contextlib.contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection from the pool, opening one if none is idle.
+        Connections are reused across request threads (Flask's dev server
+        starts one per request), so the PRAGMA setup and statement cache
+        are not repeated; WAL mode still lets lookups on one connection
+        run alongside challenge writes on another.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            # Never hand on a connection with a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a database connection tuned for concurrent access."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers run alongside the writer; NORMAL sync is safe
+        # in WAL mode and avoids an fsync on every commit
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
     def _ensure_directory(self):
         """Ensure database directory exists."""
         directory = os.path.dirname(self.db_path)
@@ -29,39 +180,72 @@ class PublicKeyRegistry:
     
     def _create_tables(self):
         """Create registry tables."""
-        cursor = self.conn.cursor()
-        
-        # Certified public keys table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS certified_keys (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT NOT NULL UNIQUE,
-                public_key TEXT NOT NULL,
-                credential_data TEXT NOT NULL,
-                signature TEXT NOT NULL,
-                issuer TEXT NOT NULL,
-                registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                verified BOOLEAN DEFAULT 1
-            )
-        ''')
-        
-        # Verification sessions table (for challenge tracking)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS verification_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL UNIQUE,
-                student_id TEXT,
-                challenge TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL,
-                used BOOLEAN DEFAULT 0
-            )
-        ''')
-        
-        self.conn.commit()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            # Certified public keys table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS certified_keys (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    student_id TEXT NOT NULL UNIQUE,
+                    public_key BLOB NOT NULL,
+                    credential_data TEXT NOT NULL,
+                    signature TEXT NOT NULL,
+                    issuer TEXT NOT NULL,
+                    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    verified BOOLEAN DEFAULT 1
+                )
+            ''')
+            
+            # Verification sessions table (for challenge tracking)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS verification_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL UNIQUE,
+                    student_id TEXT,
+                    challenge TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    expires_at TIMESTAMP NOT NULL,
+                    used BOOLEAN DEFAULT 0
+                )
+            ''')
+            
+            # Lookup of certified keys by public key (student_id and
+            # session_id already have their UNIQUE indexes)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_keys_public_key
+                ON certified_keys(public_key) WHERE verified = 1
+            ''')
+            
+            # Indexes for listing keys and sessions newest first (view_database)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_keys_registered_at
+                ON certified_keys(registered_at)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_sess_created_at
+                ON verification_sessions(created_at)
+            ''')
+            
+            self._migrate_text_public_keys(conn)
+            conn.commit()
+    
+    def _migrate_text_public_keys(self, conn: sqlite3.Connection):
+        """
+        Convert public keys stored as decimal TEXT (older registries)
+        to BLOBs. Keys that are not valid group elements could never
+        verify a proof; they are marked unverified instead.
+        """
+        rows = conn.execute(_SQL_GET_TEXT_KEYS).fetchall()
+        for row in rows:
+            try:
+                conn.execute(_SQL_SET_KEY_BLOB,
+                             (encode_public_key(row['public_key']), row['id']))
+            except ValueError:
+                conn.execute(_SQL_DISABLE_KEY, (row['id'],))
     
     
-    def register_public_key_only(self, student_id: str, public_key: str, 
+    def register_public_key_only(self, student_id: str, public_key: Union[str, int], 
                                  issuer: str = "College") -> bool:
         """
         Register ONLY a public key (privacy-preserving).
@@ -74,28 +258,24 @@ class PublicKeyRegistry:
             
         Returns:
             True if successful, False otherwise
+            
+        Raises:
+            ValueError: If the public key is not valid
         """
-        try:
-            cursor = self.conn.cursor()
-            # Store ONLY public key, no credential data!
-            cursor.execute('''
-                INSERT INTO certified_keys 
-                (student_id, public_key, credential_data, signature, issuer)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (student_id, public_key, '{}', 'N/A', issuer))
-            self.conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # Update existing entry
-            cursor.execute('''
-                UPDATE certified_keys 
-                SET public_key = ?, registered_at = CURRENT_TIMESTAMP
-                WHERE student_id = ?
-            ''', (public_key, student_id))
-            self.conn.commit()
-            return True
+        key_blob = encode_public_key(public_key)
+        with self._connection() as conn:
+            try:
+                # Store ONLY public key, no credential data!
+                conn.execute(_SQL_INSERT_KEY,
+                             (student_id, key_blob, '{}', 'N/A', issuer))
+                conn.commit()
+            except sqlite3.IntegrityError:
+                # Update existing entry
+                conn.execute(_SQL_UPDATE_KEY_ONLY, (key_blob, student_id))
+                conn.commit()
+        return True
     
-    def register_public_key(self, student_id: str, public_key: str, 
+    def register_public_key(self, student_id: str, public_key: Union[str, int], 
                            credential_data: str, signature: str, 
                            issuer: str = "College") -> bool:
         """
@@ -111,26 +291,46 @@ class PublicKeyRegistry:
             
         Returns:
             True if successful, False otherwise
+            
+        Raises:
+            ValueError: If the public key is not valid
         """
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO certified_keys 
-                (student_id, public_key, credential_data, signature, issuer)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (student_id, public_key, credential_data, signature, issuer))
-            self.conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # Update existing entry
-            cursor.execute('''
-                UPDATE certified_keys 
-                SET public_key = ?, credential_data = ?, signature = ?, 
-                    registered_at = CURRENT_TIMESTAMP
-                WHERE student_id = ?
-            ''', (public_key, credential_data, signature, student_id))
-            self.conn.commit()
-            return True
+        key_blob = encode_public_key(public_key)
+        with self._connection() as conn:
+            try:
+                conn.execute(_SQL_INSERT_KEY,
+                             (student_id, key_blob, credential_data, signature, issuer))
+                conn.commit()
+            except sqlite3.IntegrityError:
+                # Update existing entry
+                conn.execute(_SQL_UPDATE_KEY,
+                             (key_blob, credential_data, signature, student_id))
+                conn.commit()
+        return True
+    
+    def register_public_keys(self, rows: Iterable[Tuple]) -> int:
+        """
+        Register many certified public keys in a single transaction.
+        Existing entries for the same students are replaced.
+        
+        Args:
+            rows: Iterable of (student_id, public_key, credential_data,
+                  signature, issuer) tuples
+        
+        Returns:
+            Number of keys registered
+            
+        Raises:
+            ValueError: If any public key is not valid (nothing is stored)
+        """
+        # Encode every key before writing so one bad key stores nothing
+        encoded = [
+            (student_id, encode_public_key(public_key), credential_data, signature, issuer)
+            for student_id, public_key, credential_data, signature, issuer in rows
+        ]
+        with self._connection() as conn, conn:
+            conn.executemany(_SQL_REPLACE_KEY, encoded)
+        return len(encoded)
     
     def get_public_key(self, student_id: str) -> Optional[Dict]:
         """
@@ -141,17 +341,29 @@ class PublicKeyRegistry:
             student_id: Student ID
             
         Returns:
-            Dictionary with key data or None
+            Dictionary with key data (public_key as bytes) or None
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT * FROM certified_keys 
-            WHERE student_id = ? AND verified = 1
-        ''', (student_id,))
-        row = cursor.fetchone()
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_BY_STUDENT_ID, (student_id,)).fetchone()
         return dict(row) if row else None
     
-    def get_by_public_key(self, public_key: str) -> Optional[Dict]:
+    def get_parsed_credential(self, student_id: str) -> Optional[Dict]:
+        """
+        Get the stored credential for a student as a dictionary.
+        Not cached: another worker process may replace the entry at any
+        time, and a stale copy could expose removed personal data.
+        
+        Args:
+            student_id: Student ID
+            
+        Returns:
+            Credential dictionary or None
+        """
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_CREDENTIAL_DATA, (student_id,)).fetchone()
+        return orjson.loads(row['credential_data']) if row else None
+    
+    def get_by_public_key(self, public_key: Union[str, int]) -> Optional[Dict]:
         """
         Get key data by public key (privacy-preserving).
         No student ID needed!
@@ -160,14 +372,14 @@ class PublicKeyRegistry:
             public_key: Public key to lookup
             
         Returns:
-            Dictionary with key data or None
+            Dictionary with key data (public_key as bytes) or None
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT * FROM certified_keys 
-            WHERE public_key = ? AND verified = 1
-        ''', (public_key,))
-        row = cursor.fetchone()
+        try:
+            key_blob = encode_public_key(public_key)
+        except (ValueError, TypeError):
+            return None
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_BY_PUBLIC_KEY, (key_blob,)).fetchone()
         return dict(row) if row else None
     
     def verify_credential(self, student_id: str, signature: str) -> bool:
@@ -204,17 +416,68 @@ class PublicKeyRegistry:
         from datetime import timedelta
         expires_at = datetime.utcnow() + timedelta(seconds=expires_in_seconds)
         
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO verification_sessions 
-                (session_id, student_id, challenge, expires_at)
-                VALUES (?, ?, ?, ?)
-            ''', (session_id, student_id, challenge, expires_at.isoformat()))
-            self.conn.commit()
-            return True
-        except sqlite3.IntegrityError:
+        pending = _PendingWrite((session_id, student_id, challenge,
+                                 expires_at.isoformat(timespec='microseconds')))
+        self._ensure_writer()
+        self._write_queue.put(pending)
+        # Wait for the batch commit so the challenge is durable (and
+        # visible to other connections) before it is handed out; a writer
+        # that never answers (e.g. not running in a forked child) fails
+        # the write instead of hanging the request
+        if not pending.done.wait(self.WRITE_TIMEOUT):
             return False
+        return pending.success
+    
+    def _ensure_writer(self):
+        """Start the challenge writer thread if it is not running."""
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._writer_loop, name='registry-writer', daemon=True
+                    )
+                    self._writer.start()
+    
+    def _writer_loop(self):
+        """
+        Commit queued challenge rows in batches (group commit), so
+        concurrent requests share one transaction. Only rows that are
+        already queued join a batch; the writer never waits for more, so
+        a lone request is committed immediately.
+        """
+        while True:
+            batch: List[_PendingWrite] = [self._write_queue.get()]
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+    
+    def _write_batch(self, batch: List[_PendingWrite]):
+        """
+        Insert a batch of challenge rows in a single transaction.
+        Any error fails only this batch, so the writer thread keeps
+        running for the next one.
+        """
+        try:
+            # Opening a connection can fail too (e.g. a locked database)
+            with self._connection() as conn:
+                for pending in batch:
+                    try:
+                        conn.execute(_SQL_INSERT_CHALLENGE, pending.params)
+                        pending.success = True
+                    except sqlite3.IntegrityError:
+                        # Duplicate session ID; only this row fails
+                        pending.success = False
+                conn.commit()
+        except Exception:
+            # Nothing was committed (_connection() rolls back what is open)
+            for pending in batch:
+                pending.success = False
+        finally:
+            for pending in batch:
+                pending.done.set()
     
     def get_challenge(self, session_id: str) -> Optional[str]:
         """
@@ -226,26 +489,12 @@ class PublicKeyRegistry:
         Returns:
             Challenge or None
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT challenge, expires_at, used FROM verification_sessions
-            WHERE session_id = ?
-        ''', (session_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            return None
-        
-        # Check if expired
-        expires_at = datetime.fromisoformat(row['expires_at'])
-        if datetime.utcnow() > expires_at:
-            return None
-        
-        # Check if already used
-        if row['used']:
-            return None
-        
-        return row['challenge']
+        # Expiry and reuse are checked in SQL; fixed-width ISO-8601
+        # timestamps compare correctly as strings
+        now = datetime.utcnow().isoformat(timespec='microseconds')
+        with self._connection() as conn:
+            row = conn.execute(_SQL_GET_CHALLENGE, (session_id, now)).fetchone()
+        return row['challenge'] if row else None
     
     def mark_challenge_used(self, session_id: str) -> bool:
         """
@@ -255,17 +504,17 @@ class PublicKeyRegistry:
             session_id: Session ID
             
         Returns:
-            True if successful
+            True if the challenge was unused and is now marked used
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            UPDATE verification_sessions 
-            SET used = 1 
-            WHERE session_id = ?
-        ''', (session_id,))
-        self.conn.commit()
+        with self._connection() as conn:
+            cursor = conn.execute(_SQL_MARK_CHALLENGE_USED, (session_id,))
+            conn.commit()
         return cursor.rowcount > 0
     
     def close(self):
-        """Close database connection."""
-        self.conn.close()
+        """Close all idle pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -8,8 +8,116 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from crypto.schnorr import SchnorrZKP
-from typing import Dict, Optional
-import uuid
+from crypto.utils import CryptoUtils
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import base64
+import binascii
+import functools
+import threading
+
+
+# Number of parsed public keys kept by _parse_public_key
+PUBLIC_KEY_CACHE_SIZE = 4096
+
+# Marks a base64-encoded integer in proofs and public keys ("0x" marks hex)
+_B64_PREFIX = 'b64:'
+
+# Proof lists at least this long are verified in a process pool by
+# verify_many; shorter ones are verified inline
+PARALLEL_VERIFY_THRESHOLD = 64
+
+_verify_pool: Optional[ProcessPoolExecutor] = None
+_verify_pool_lock = threading.Lock()
+
+# Shared verifier returned by get_verifier(); its state is read-only
+# after construction
+_verifier: Optional['ZKPVerifier'] = None
+_verifier_lock = threading.Lock()
+
+
+def _to_int(value: Union[str, bytes, int]) -> int:
+    """
+    Convert a proof value or public key to an integer.
+    
+    Accepts "0x"-prefixed hex, "b64:"-prefixed base64 of the big-endian
+    bytes, decimal (the original wire format, anything int() accepts),
+    raw big-endian bytes (registry BLOBs) or an integer. The format is
+    given by the prefix, never guessed. Hex, base64 and bytes parse in
+    linear time, unlike CPython's quadratic decimal parse.
+    
+    Raises:
+        ValueError: If the value is not valid in its format
+        TypeError: If the value is of an unsupported type
+    """
+    if isinstance(value, bytes):
+        return int.from_bytes(value, byteorder='big')
+    if isinstance(value, int):
+        return value
+    if not isinstance(value, str):
+        raise TypeError(f"Cannot convert {type(value).__name__} to int")
+    if value[:2] in ('0x', '0X'):
+        return int(value[2:], 16)
+    if value.startswith(_B64_PREFIX):
+        try:
+            data = base64.b64decode(value[len(_B64_PREFIX):], validate=True)
+        except binascii.Error:
+            raise ValueError(f"Invalid base64 integer: {value[:20]!r}")
+        if not data:
+            raise ValueError("Empty base64 integer")
+        return int.from_bytes(data, byteorder='big')
+    return int(value)
+
+
+@functools.lru_cache(maxsize=PUBLIC_KEY_CACHE_SIZE)
+def _parse_public_key(public_key: Union[str, bytes]) -> int:
+    """
+    Convert a public key to an integer, caching the result.
+    A student's key is the same on every verification, so only its first
+    use pays for the parse (failures are not cached).
+    """
+    return _to_int(public_key)
+
+
+def get_verifier() -> 'ZKPVerifier':
+    """
+    Get the process-wide ZKPVerifier, creating it on first use.
+    
+    Returns:
+        Shared ZKPVerifier instance
+    """
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = ZKPVerifier()
+    return _verifier
+
+
+# Marks a field missing from a proof dictionary
+_MISSING = object()
+
+
+def _proof_field(proof: Dict, name: str, alias: str):
+    """
+    Get a proof value by its name or, failing that, its short alias
+    (e.g. "commitment" or "t"), or None if it has neither.
+    A falsy value such as 0 is returned as is rather than skipped.
+    """
+    value = proof.get(name, _MISSING)
+    if value is _MISSING:
+        value = proof.get(alias)
+    return value
+
+
+def _init_verify_worker():
+    """Create the verifier (and its fixed-base table) once per worker process."""
+    get_verifier()
+
+
+def _verify_one(item: Tuple[str, str, str, Union[str, bytes]]) -> bool:
+    """Verify one (commitment, response, challenge, public_key) proof in a worker."""
+    return get_verifier().verify_proof(*item)
 
 
 class ZKPVerifier:
@@ -18,15 +126,28 @@ class ZKPVerifier:
     def __init__(self):
         """Initialize ZKP verifier."""
         self.zkp = SchnorrZKP()
+        # Build the table for g up front instead of on the first request
+        CryptoUtils.precompute_fixed_base()
+    
+    def _in_range(self, t: int, s: int, y: int) -> bool:
+        """
+        Check that a commitment, response and public key are in range
+        (0 < t < p, 0 <= s < q, 0 < y < p).
+        Out-of-range proofs can never be valid, so this rejects them
+        without any modular exponentiation.
+        """
+        return 0 < t < self.zkp.p and 0 <= s < self.zkp.q and 0 < y < self.zkp.p
     
     def generate_challenge_session(self) -> Dict[str, str]:
         """
-        Generate a new challenge session.
+        Generate a new challenge session (interactive proofs only;
+        non-interactive proofs derive their challenge and need no session).
         
         Returns:
             Dictionary with session_id and challenge
         """
-        session_id = str(uuid.uuid4())
+        # 128 random bits as 32 hex characters
+        session_id = os.urandom(16).hex()
         challenge = self.zkp.generate_challenge()
         
         return {
@@ -35,7 +156,7 @@ class ZKPVerifier:
         }
     
     def verify_proof(self, commitment: str, response: str, 
-                    challenge: str, public_key: str) -> bool:
+                    challenge: str, public_key: Union[str, bytes]) -> bool:
         """
         Verify a ZKP proof.
         
@@ -48,21 +169,24 @@ class ZKPVerifier:
         Returns:
             True if proof is valid, False otherwise
         """
+        # Only the parsing can raise, so only it is guarded
         try:
             # Convert strings to integers
-            t = int(commitment)
-            s = int(response)
-            c = int(challenge)
-            y = int(public_key)
-            
-            # Verify proof
-            return self.zkp.verify_proof(t, s, c, y)
-            
+            t = _to_int(commitment)
+            s = _to_int(response)
+            c = _to_int(challenge)
+            y = _parse_public_key(public_key)
         except (ValueError, TypeError):
             return False
+        
+        if not self._in_range(t, s, y):
+            return False
+        
+        # Verify proof
+        return self.zkp.verify_proof(t, s, c, y)
     
     def verify_complete_proof(self, proof: Dict, challenge: str, 
-                             public_key: str) -> bool:
+                             public_key: Union[str, bytes]) -> bool:
         """
         Verify a complete proof dictionary.
         
@@ -76,10 +200,10 @@ class ZKPVerifier:
             True if valid, False otherwise
         """
         # Support both formats: {commitment, response} and {t, s, c}
-        commitment = proof.get('commitment') or proof.get('t')
-        response = proof.get('response') or proof.get('s')
+        commitment = _proof_field(proof, 'commitment', 't')
+        response = _proof_field(proof, 'response', 's')
         
-        if not commitment or not response:
+        if commitment is None or response is None:
             return False
         
         return self.verify_proof(
@@ -89,13 +213,115 @@ class ZKPVerifier:
             public_key
         )
     
-    def verify_non_interactive_proof(self, proof: Dict, public_key: str, 
+    def verify_batch(self, proofs: Sequence[Dict], challenges: Sequence[str],
+                     public_keys: Sequence[Union[str, bytes]]) -> bool:
+        """
+        Verify several proofs with one combined check.
+        
+        Args:
+            proofs: Proof dictionaries, {commitment, response} or {t, s}
+            challenges: Challenge sent for each proof
+            public_keys: Public key for each proof
+            
+        Returns:
+            True if every proof is valid, False otherwise
+        """
+        items = []
+        try:
+            for proof, challenge, public_key in zip(proofs, challenges, public_keys):
+                commitment = _proof_field(proof, 'commitment', 't')
+                response = _proof_field(proof, 'response', 's')
+                if commitment is None or response is None:
+                    return False
+                items.append((str(commitment), str(response), challenge, public_key))
+        except AttributeError:
+            return False
+        
+        return self.verify_proofs_batch(items)
+    
+    def verify_proofs_batch(self, items: Sequence[Tuple[str, str, str, Union[str, bytes]]]) -> bool:
+        """
+        Verify several proofs with one combined check (batch form of
+        verify_proof).
+        
+        Args:
+            items: Sequence of (commitment, response, challenge, public_key)
+                   tuples
+            
+        Returns:
+            True if every proof is valid, False otherwise
+        """
+        try:
+            batch = [
+                (_to_int(commitment), _to_int(response), _to_int(challenge),
+                 _parse_public_key(public_key))
+                for commitment, response, challenge, public_key in items
+            ]
+        except (ValueError, TypeError):
+            return False
+        
+        if not all(self._in_range(t, s, y) for t, s, _, y in batch):
+            return False
+        
+        return self.zkp.verify_batch(batch)
+    
+    def verify_batch_detailed(self, proofs: Sequence[Dict], challenges: Sequence[str],
+                              public_keys: Sequence[Union[str, bytes]]) -> List[bool]:
+        """
+        Verify several proofs, reporting the result of each one.
+        The whole batch is checked at once; only if that fails is it
+        bisected to find the invalid proofs.
+        
+        Args:
+            proofs: Proof dictionaries, {commitment, response} or {t, s}
+            challenges: Challenge sent for each proof
+            public_keys: Public key for each proof
+            
+        Returns:
+            List with True for each valid proof and False for each invalid one
+        """
+        if len(proofs) == 1:
+            return [self.verify_complete_proof(proofs[0], challenges[0], public_keys[0])]
+        if not proofs or self.verify_batch(proofs, challenges, public_keys):
+            return [True] * len(proofs)
+        
+        mid = len(proofs) // 2
+        return (self.verify_batch_detailed(proofs[:mid], challenges[:mid], public_keys[:mid]) +
+                self.verify_batch_detailed(proofs[mid:], challenges[mid:], public_keys[mid:]))
+    
+    def verify_many(self, items: Sequence[Tuple[str, str, str, Union[str, bytes]]]) -> List[bool]:
+        """
+        Verify many independent proofs, spreading large lists over all
+        cores with a process pool.
+        
+        Args:
+            items: Sequence of (commitment, response, challenge, public_key)
+                   tuples
+            
+        Returns:
+            List with the verification result of each proof
+        """
+        global _verify_pool
+        workers = os.cpu_count() or 1
+        if workers == 1 or len(items) < PARALLEL_VERIFY_THRESHOLD:
+            return [self.verify_proof(*item) for item in items]
+        
+        with _verify_pool_lock:
+            if _verify_pool is None:
+                _verify_pool = ProcessPoolExecutor(initializer=_init_verify_worker)
+        chunksize = max(1, len(items) // (4 * workers))
+        return list(_verify_pool.map(_verify_one, items, chunksize=chunksize))
+    
+    def verify_non_interactive_proof(self, proof: Dict, public_key: Union[str, bytes], 
                                     message: str = "") -> bool:
         """
         Verify a non-interactive proof.
+        The challenge is derived by Fiat-Shamir, so no challenge session
+        is needed; "challenge" may be omitted from the proof.
         
         Args:
-            proof: Proof dictionary with commitment, response, challenge
+            proof: Proof dictionary with commitment, response and
+                   optionally challenge
             public_key: Public key
             message: Optional message
             
@@ -105,13 +331,16 @@ class ZKPVerifier:
         try:
             # Convert to integers
             proof_int = {
-                'commitment': int(proof['commitment']),
-                'response': int(proof['response']),
-                'challenge': int(proof['challenge'])
+                'commitment': _to_int(proof['commitment']),
+                'response': _to_int(proof['response'])
             }
-            y = int(public_key)
-            
-            return self.zkp.verify_non_interactive_proof(proof_int, y, message)
-            
+            if 'challenge' in proof:
+                proof_int['challenge'] = _to_int(proof['challenge'])
+            y = _parse_public_key(public_key)
         except (ValueError, TypeError, KeyError):
             return False
+        
+        if not self._in_range(proof_int['commitment'], proof_int['response'], y):
+            return False
+        
+        return self.zkp.verify_non_interactive_proof(proof_int, y, message)
@@ -0,0 +1,26 @@
+"""
+WSGI entry point for verifier (scholarship backend) layer.
+Serves the Flask application with a production server instead of the
+single-threaded development server started by verifier/app.py, e.g.:
+
+    gunicorn -w $(nproc) -k gthread --threads 8 -b 0.0.0.0:5002 verifier.wsgi:app
+
+Each worker process builds its own app with its own small pool of SQLite
+connections to the registry, which its threads borrow per query and share
+(the registry runs in WAL mode, so readers do not block writers).
+
+Everything else kept in memory is per worker too: each runs its own
+challenge writer thread, its own caches of parsed public keys and
+exponentiation tables, and its own eligibility decision history (so
+/decisions only lists the decisions made by the worker that answers).
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from verifier.app import create_app
+
+app = create_app()
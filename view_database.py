@@ -4,140 +4,300 @@ Shows what data is stored in issuer and verifier databases.
 """
 
 import sys
-import os
 import json
-sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+import argparse
+import pathlib
+import sqlite3
 
-from issuer.database import Database as IssuerDB
-from verifier.registry import PublicKeyRegistry
+try:
+    import orjson
+except ImportError:  # orjson is optional for the viewer
+    orjson = None  # type: ignore[assignment]
 
 
-def view_issuer_database():
-    """View issuer (college) database contents."""
-    print("=" * 80)
-    print("ISSUER DATABASE (College)")
-    print("=" * 80)
+# Databases written by the issuer and verifier services
+ISSUER_DB_PATH = "issuer/college.db"
+VERIFIER_DB_PATH = "verifier/registry.db"
+
+
+# Queries select only the displayed columns; LIMIT -1 means no limit.
+# Credential fields are read with SQLite's json_extract() rather than
+# parsing credential_data in Python
+_SQL_STUDENTS = '''
+    SELECT student_id, name, email, department, admission_year, status, created_at
+    FROM students ORDER BY student_id LIMIT ? OFFSET ?
+'''
+_SQL_KEY_BINDINGS = '''
+    SELECT id, student_id, public_key, bound_at
+    FROM key_bindings ORDER BY bound_at DESC LIMIT ? OFFSET ?
+'''
+_SQL_CREDENTIALS = '''
+    SELECT id, student_id, public_key, status, issued_at,
+           json_extract(credential_data, '$.name') AS name,
+           json_extract(credential_data, '$.department') AS department,
+           json_extract(credential_data, '$.admission_year') AS admission_year,
+           json_extract(credential_data, '$.expires_at') AS expires_at
+    FROM credentials ORDER BY issued_at DESC LIMIT ? OFFSET ?
+'''
+_SQL_CERTIFIED_KEYS = '''
+    SELECT id, student_id, public_key, issuer, verified, registered_at,
+           json_extract(credential_data, '$.name') AS name,
+           json_extract(credential_data, '$.department') AS department
+    FROM certified_keys ORDER BY registered_at DESC LIMIT ? OFFSET ?
+'''
+
+# Fallbacks for SQLite builds without the JSON functions: credential_data
+# is returned as is and parsed with orjson (or json without it)
+_SQL_CREDENTIALS_RAW = '''
+    SELECT id, student_id, public_key, status, issued_at, credential_data
+    FROM credentials ORDER BY issued_at DESC LIMIT ? OFFSET ?
+'''
+_SQL_CERTIFIED_KEYS_RAW = '''
+    SELECT id, student_id, public_key, issuer, verified, registered_at, credential_data
+    FROM certified_keys ORDER BY registered_at DESC LIMIT ? OFFSET ?
+'''
+_CREDENTIAL_FIELDS = ('name', 'department', 'admission_year', 'expires_at')
+_CERTIFIED_KEY_FIELDS = ('name', 'department')
+_SQL_SESSIONS = '''
+    SELECT session_id, student_id, challenge, created_at, expires_at, used
+    FROM verification_sessions ORDER BY created_at DESC LIMIT 10
+'''
+
+# Per-row report templates, filled with str.format_map()
+_STUDENT_TMPL = (
+    "\nStudent ID: {student_id}\n"
+    "  Name: {name}\n"
+    "  Email: {email}\n"
+    "  Department: {department}\n"
+    "  Admission Year: {admission_year}\n"
+    "  Status: {status}\n"
+    "  Created: {created_at}"
+)
+_BINDING_TMPL = (
+    "\nBinding ID: {id}\n"
+    "  Student ID: {student_id}\n"
+    "  Public Key: {public_key:.50}...\n"
+    "  Bound At: {bound_at}"
+)
+_CREDENTIAL_TMPL = (
+    "\nCredential ID: {id}\n"
+    "  Student ID: {student_id}\n"
+    "  Public Key: {public_key:.50}...\n"
+    "  Status: {status}\n"
+    "  Issued At: {issued_at}\n"
+    "  Credential Details:\n"
+    "    - Name: {name}\n"
+    "    - Department: {department}\n"
+    "    - Admission Year: {admission_year}\n"
+    "    - Expires: {expires_at}"
+)
+_CERTIFIED_KEY_TMPL = (
+    "\nRegistry ID: {id}\n"
+    "  Student ID: {student_id}\n"
+    "  Public Key: {public_key:.50}...\n"
+    "  Issuer: {issuer}\n"
+    "  Verified: {verified}\n"
+    "  Registered At: {registered_at}\n"
+    "  Student Info (from credential):\n"
+    "    - Name: {name}\n"
+    "    - Department: {department}"
+)
+_SESSION_TMPL = (
+    "\nSession ID: {session_id}\n"
+    "  Student ID: {student_id}\n"
+    "  Challenge: {challenge:.30}...\n"
+    "  Created: {created_at}\n"
+    "  Expires: {expires_at}\n"
+    "  Used: {used}"
+)
+
+# Rows fetched from SQLite per batch, so tables are streamed rather than
+# loaded into memory at once
+FETCH_SIZE = 256
+
+
+def _iter_rows(cursor, size: int = FETCH_SIZE):
+    """Yield a cursor's rows, fetching them in batches of size."""
+    while True:
+        batch = cursor.fetchmany(size)
+        if not batch:
+            return
+        yield from batch
+
+
+def _has_json_functions(conn: sqlite3.Connection) -> bool:
+    """Check whether SQLite was built with json_extract() (JSON1)."""
+    try:
+        conn.execute("SELECT json_extract('{}', '$.x')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _with_credential_fields(row: sqlite3.Row, fields) -> dict:
+    """Copy a row, adding the given fields parsed from its credential_data."""
+    raw = row['credential_data']
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    return dict(row, **{field: data.get(field) for field in fields})
+
+
+def _connect_readonly(db_path: str) -> sqlite3.Connection:
+    """
+    Open a database read-only, so the viewer can never modify it.
     
-    db = IssuerDB()
+    Args:
+        db_path: Path to the database file
+        
+    Returns:
+        Connection returning sqlite3.Row rows
+        
+    Raises:
+        sqlite3.OperationalError: If the database does not exist
+    """
+    uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.row_factory = sqlite3.Row
+    # Journal mode and sync level are set by the services that write the
+    # databases; reads only benefit from a larger page cache and mmap I/O
+    conn.execute('PRAGMA cache_size=-65536')
+    conn.execute('PRAGMA mmap_size=268435456')
+    return conn
+
+
+def view_issuer_database(limit: int = -1, offset: int = 0):
+    """
+    View issuer (college) database contents.
     
-    # View students
-    print("\n📚 STUDENTS TABLE:")
-    print("-" * 80)
-    students = db.get_all_students()
+    Args:
+        limit: Maximum number of rows shown per table (-1 for all)
+        offset: Number of rows skipped in each table
+    """
+    # Collect the report and write it once instead of printing per line
+    lines = []
+    lines.append("=" * 80)
+    lines.append("ISSUER DATABASE (College)")
+    lines.append("=" * 80)
     
-    if students:
-        for student in students:
-            print(f"\nStudent ID: {student['student_id']}")
-            print(f"  Name: {student['name']}")
-            print(f"  Email: {student['email']}")
-            print(f"  Department: {student['department']}")
-            print(f"  Admission Year: {student['admission_year']}")
-            print(f"  Status: {student['status']}")
-            print(f"  Created: {student['created_at']}")
-    else:
-        print("No students found")
+    try:
+        conn = _connect_readonly(ISSUER_DB_PATH)
+    except sqlite3.OperationalError:
+        lines.append(f"\nDatabase not found: {ISSUER_DB_PATH}")
+        sys.stdout.write("\n".join(lines) + "\n")
+        return
     
-    # View key bindings
-    print("\n\n🔑 KEY BINDINGS TABLE:")
-    print("-" * 80)
-    cursor = db.conn.cursor()
-    cursor.execute('SELECT * FROM key_bindings ORDER BY bound_at DESC')
-    bindings = cursor.fetchall()
+    # View students
+    lines.append("\n📚 STUDENTS TABLE:")
+    lines.append("-" * 80)
+    cursor = conn.cursor()
+    cursor.execute(_SQL_STUDENTS, (limit, offset))
+    found = False
+    for student in _iter_rows(cursor):
+        found = True
+        lines.append(_STUDENT_TMPL.format_map(student))
+    if not found:
+        lines.append("No students found")
     
-    if bindings:
-        for binding in bindings:
-            print(f"\nBinding ID: {binding['id']}")
-            print(f"  Student ID: {binding['student_id']}")
-            print(f"  Public Key: {binding['public_key'][:50]}...")
-            print(f"  Bound At: {binding['bound_at']}")
-    else:
-        print("No key bindings found")
+    # View key bindings
+    lines.append("\n\n🔑 KEY BINDINGS TABLE:")
+    lines.append("-" * 80)
+    cursor.execute(_SQL_KEY_BINDINGS, (limit, offset))
+    found = False
+    for binding in _iter_rows(cursor):
+        found = True
+        lines.append(_BINDING_TMPL.format_map(binding))
+    if not found:
+        lines.append("No key bindings found")
     
     # View credentials
-    print("\n\n📜 CREDENTIALS TABLE:")
-    print("-" * 80)
-    cursor.execute('SELECT * FROM credentials ORDER BY issued_at DESC')
-    credentials = cursor.fetchall()
-    
-    if credentials:
-        for cred in credentials:
-            print(f"\nCredential ID: {cred['id']}")
-            print(f"  Student ID: {cred['student_id']}")
-            print(f"  Public Key: {cred['public_key'][:50]}...")
-            print(f"  Status: {cred['status']}")
-            print(f"  Issued At: {cred['issued_at']}")
-            
-            # Parse credential data
-            cred_data = json.loads(cred['credential_data'])
-            print(f"  Credential Details:")
-            print(f"    - Name: {cred_data.get('name')}")
-            print(f"    - Department: {cred_data.get('department')}")
-            print(f"    - Admission Year: {cred_data.get('admission_year')}")
-            print(f"    - Expires: {cred_data.get('expires_at')}")
-    else:
-        print("No credentials issued yet")
+    lines.append("\n\n📜 CREDENTIALS TABLE:")
+    lines.append("-" * 80)
+    json_functions = _has_json_functions(conn)
+    cursor.execute(_SQL_CREDENTIALS if json_functions else _SQL_CREDENTIALS_RAW,
+                   (limit, offset))
+    found = False
+    for cred in _iter_rows(cursor):
+        found = True
+        if not json_functions:
+            cred = _with_credential_fields(cred, _CREDENTIAL_FIELDS)
+        lines.append(_CREDENTIAL_TMPL.format_map(cred))
+    if not found:
+        lines.append("No credentials issued yet")
     
-    db.close()
+    conn.close()
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
-def view_verifier_database():
-    """View verifier (scholarship) database contents."""
-    print("\n\n" + "=" * 80)
-    print("VERIFIER DATABASE (Scholarship Backend)")
-    print("=" * 80)
+def view_verifier_database(limit: int = -1, offset: int = 0):
+    """
+    View verifier (scholarship) database contents.
     
-    registry = PublicKeyRegistry()
+    Args:
+        limit: Maximum number of certified keys shown (-1 for all)
+        offset: Number of certified keys skipped
+    """
+    lines = []
+    lines.append("\n\n" + "=" * 80)
+    lines.append("VERIFIER DATABASE (Scholarship Backend)")
+    lines.append("=" * 80)
     
-    # View certified keys
-    print("\n🔐 CERTIFIED PUBLIC KEYS REGISTRY:")
-    print("-" * 80)
-    cursor = registry.conn.cursor()
-    cursor.execute('SELECT * FROM certified_keys ORDER BY registered_at DESC')
-    keys = cursor.fetchall()
+    try:
+        conn = _connect_readonly(VERIFIER_DB_PATH)
+    except sqlite3.OperationalError:
+        lines.append(f"\nDatabase not found: {VERIFIER_DB_PATH}")
+        sys.stdout.write("\n".join(lines) + "\n")
+        return
     
-    if keys:
-        for key in keys:
-            print(f"\nRegistry ID: {key['id']}")
-            print(f"  Student ID: {key['student_id']}")
-            print(f"  Public Key: {key['public_key'][:50]}...")
-            print(f"  Issuer: {key['issuer']}")
-            print(f"  Verified: {'Yes' if key['verified'] else 'No'}")
-            print(f"  Registered At: {key['registered_at']}")
-            
-            # Parse credential
-            cred_data = json.loads(key['credential_data'])
-            print(f"  Student Info (from credential):")
-            print(f"    - Name: {cred_data.get('name')}")
-            print(f"    - Department: {cred_data.get('department')}")
-    else:
-        print("No certified keys registered yet")
+    # View certified keys
+    lines.append("\n🔐 CERTIFIED PUBLIC KEYS REGISTRY:")
+    lines.append("-" * 80)
+    cursor = conn.cursor()
+    json_functions = _has_json_functions(conn)
+    cursor.execute(_SQL_CERTIFIED_KEYS if json_functions else _SQL_CERTIFIED_KEYS_RAW,
+                   (limit, offset))
+    found = False
+    for key in _iter_rows(cursor):
+        found = True
+        if not json_functions:
+            key = _with_credential_fields(key, _CERTIFIED_KEY_FIELDS)
+        # Stored as a BLOB; rows that failed migration remain TEXT
+        public_key = key['public_key']
+        if isinstance(public_key, bytes):
+            public_key = public_key.hex()
+        lines.append(_CERTIFIED_KEY_TMPL.format_map(dict(
+            key, public_key=public_key, verified='Yes' if key['verified'] else 'No')))
+    if not found:
+        lines.append("No certified keys registered yet")
     
     # View verification sessions
-    print("\n\n🎯 VERIFICATION SESSIONS:")
-    print("-" * 80)
-    cursor.execute('SELECT * FROM verification_sessions ORDER BY created_at DESC LIMIT 10')
-    sessions = cursor.fetchall()
-    
-    if sessions:
-        for session in sessions:
-            print(f"\nSession ID: {session['session_id']}")
-            print(f"  Student ID: {session['student_id'] or 'N/A'}")
-            print(f"  Challenge: {session['challenge'][:30]}...")
-            print(f"  Created: {session['created_at']}")
-            print(f"  Expires: {session['expires_at']}")
-            print(f"  Used: {'Yes' if session['used'] else 'No'}")
-    else:
-        print("No verification sessions yet")
+    lines.append("\n\n🎯 VERIFICATION SESSIONS:")
+    lines.append("-" * 80)
+    cursor.execute(_SQL_SESSIONS)
+    found = False
+    for session in _iter_rows(cursor):
+        found = True
+        lines.append(_SESSION_TMPL.format_map(dict(
+            session, student_id=session['student_id'] or 'N/A',
+            used='Yes' if session['used'] else 'No')))
+    if not found:
+        lines.append("No verification sessions yet")
     
-    registry.close()
+    conn.close()
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
     """Main function to view all databases."""
+    parser = argparse.ArgumentParser(description="View ZKP system database contents")
+    parser.add_argument('--limit', type=int, default=-1,
+                        help="maximum rows shown per table (default: all)")
+    parser.add_argument('--offset', type=int, default=0,
+                        help="rows skipped in each table (default: 0)")
+    args = parser.parse_args()
+    
     print("\n" + "🔍 ZKP SYSTEM DATABASE VIEWER" + "\n")
     
-    view_issuer_database()
-    view_verifier_database()
+    view_issuer_database(args.limit, args.offset)
+    view_verifier_database(args.limit, args.offset)
     
     print("\n" + "=" * 80)
     print("Database view complete!")